@@ -0,0 +1,148 @@
+"""
+Benchmark: wall time, force evaluations and energy error of the nbody integrators.
+
+Usage: python bench_integrators.py [--time T] [--output-step DT]
+
+Every method integrates the notebook's three-body system from t = 0 to T. The
+energy error is the largest relative drift of the total energy at the output
+times; the position error is the distance of the final positions from a
+DOP853 run at rtol = atol = 1e-13. Forces are counted on the NumPy backend;
+with Numba installed, the fixed-step methods are also checked and timed on
+the compiled backend.
+"""
+import argparse
+import time
+
+import numpy as np
+
+import nbody
+
+# The three bodies of the notebook: masses, starting positions and velocities.
+MASSES = [10, 20, 30]
+POSITIONS = [(-10, 10, -11), (0, 0, 0), (10, 10, 12)]
+VELOCITIES = [(-3, 0, 0), (0, 0, 0), (3, 0, 0)]
+
+# (method, step for the fixed-step methods or tolerance for the adaptive ones)
+RUNS = [
+    ("euler", 1e-3),  # the notebook
+    ("euler", 1e-4),
+    ("leapfrog", 1e-2),
+    ("leapfrog", 1e-3),
+    ("yoshida4", 1e-2),
+    ("yoshida4", 2e-3),
+    ("rk45", 1e-8),
+    ("rk45", 1e-11),
+    ("dop853", 1e-8),
+    ("dop853", 1e-11),
+]
+
+
+def notebook_accelerations(p1, p2, p3, m_1=10, m_2=20, m_3=30):
+    """The notebook's original three-body accelerations, kept as the reference implementation."""
+    planet_1_dv = -9.8 * m_2 * (p1 - p2) / (np.sqrt(np.sum((p1 - p2) ** 2)) ** 3) - \
+        9.8 * m_3 * (p1 - p3) / (np.sqrt(np.sum((p1 - p3) ** 2)) ** 3)
+    planet_2_dv = -9.8 * m_3 * (p2 - p3) / (np.sqrt(np.sum((p2 - p3) ** 2)) ** 3) - \
+        9.8 * m_1 * (p2 - p1) / (np.sqrt(np.sum((p2 - p1) ** 2)) ** 3)
+    planet_3_dv = -9.8 * m_1 * (p3 - p1) / (np.sqrt(np.sum((p3 - p1) ** 2)) ** 3) - \
+        9.8 * m_2 * (p3 - p2) / (np.sqrt(np.sum((p3 - p2) ** 2)) ** 3)
+    return planet_1_dv, planet_2_dv, planet_3_dv
+
+
+def check_equivalence(steps=2000, delta_t=0.001):
+    """nbody's euler must follow the notebook's per-body loop."""
+    p = np.array(POSITIONS, dtype=float)
+    v = np.array(VELOCITIES, dtype=float)
+    expected = [p]
+    for _ in range(steps - 1):
+        dv = np.array(notebook_accelerations(*p))
+        p, v = p + v * delta_t, v + dv * delta_t
+        expected.append(p)
+    positions, _ = nbody.simulate(POSITIONS, VELOCITIES, MASSES, delta_t, steps, backend="numpy")
+    if not np.allclose(positions, expected, rtol=0, atol=1e-9):
+        raise AssertionError("nbody euler diverged from the notebook's loop")
+    print(f"nbody euler matches the notebook's loop for {steps} steps.")
+
+
+def check_backends(steps=20000, delta_t=0.001):
+    """The compiled loops must give the NumPy trajectories up to rounding."""
+    if nbody.numba_kernel() is None:
+        print("Numba is not installed; only the NumPy backend is available.")
+        return False
+    for method in nbody.STEPPERS:
+        expected = nbody.simulate(POSITIONS, VELOCITIES, MASSES, delta_t, steps, method=method, backend="numpy")
+        compiled = nbody.simulate(POSITIONS, VELOCITIES, MASSES, delta_t, steps, method=method, backend="numba")
+        for name, a, b in zip(("positions", "velocities"), compiled, expected):
+            if not np.allclose(a, b, rtol=1e-9, atol=1e-9):
+                raise AssertionError(f"numba {method} {name} diverged from numpy by {np.max(np.abs(a - b)):.1e}")
+    print(f"numba backend matches numpy for {steps} steps of {', '.join(nbody.STEPPERS)}.")
+    return True
+
+
+def counted_run(method, setting, end_time, output_step):
+    """Run one method; returns (p, v, seconds, force evaluations)."""
+    original = nbody.accelerations
+    calls = 0
+
+    def counted(*args, **kwargs):
+        nonlocal calls
+        calls += 1
+        return original(*args, **kwargs)
+
+    if method in nbody.ADAPTIVE:
+        options = {"delta_t": output_step, "rtol": setting, "atol": setting}
+        steps = int(round(end_time / output_step)) + 1
+    else:
+        options = {"delta_t": setting}
+        steps = int(round(end_time / setting)) + 1
+    nbody.accelerations = counted
+    try:
+        start = time.perf_counter()
+        p, v = nbody.simulate(POSITIONS, VELOCITIES, MASSES, steps=steps, method=method, backend="numpy",
+                              **options)
+        elapsed = time.perf_counter() - start
+    finally:
+        nbody.accelerations = original
+    return p, v, elapsed, calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--time", type=float, default=20.0, help="simulated time (the notebook runs 200)")
+    parser.add_argument("--output-step", type=float, default=0.01,
+                        help="time between the output rows of the adaptive methods")
+    args = parser.parse_args()
+
+    check_equivalence()
+    compiled = check_backends()
+    masses = np.array(MASSES, dtype=float)
+    reference, _ = nbody.simulate(POSITIONS, VELOCITIES, MASSES, args.output_step,
+                                  int(round(args.time / args.output_step)) + 1, method="dop853",
+                                  rtol=1e-13, atol=1e-13)
+    print(f"Three bodies from t = 0 to {args.time:g}")
+    print(f"{'method':>9} {'dt / tol':>9} {'seconds':>8} {'forces':>9} {'energy error':>13} {'position error':>15}")
+    baseline = None
+    for method, setting in RUNS:
+        p, v, elapsed, calls = counted_run(method, setting, args.time, args.output_step)
+        energies = nbody.energy(p, v, masses)
+        energy_error = np.max(np.abs(energies / energies[0] - 1))
+        position_error = np.max(np.linalg.norm(p[-1] - reference[-1], axis=-1))
+        baseline = baseline or calls
+        print(f"{method:>9} {setting:>9.0e} {elapsed:>8.2f} {calls:>9} {energy_error:>13.2e} {position_error:>15.2e}"
+              + (f"   {baseline / calls:.0f}x fewer forces than the notebook" if calls < baseline else ""))
+
+    if compiled:
+        steps = int(round(args.time / 1e-3)) + 1
+        print(f"Fixed-step methods, {steps - 1} steps of 0.001")
+        print(f"{'method':>9} {'numpy s':>8} {'numba s':>8} {'speedup':>8}")
+        for method in nbody.STEPPERS:
+            seconds = {}
+            for backend in ("numpy", "numba"):
+                start = time.perf_counter()
+                nbody.simulate(POSITIONS, VELOCITIES, MASSES, 1e-3, steps, method=method, backend=backend)
+                seconds[backend] = time.perf_counter() - start
+            print(f"{method:>9} {seconds['numpy']:>8.2f} {seconds['numba']:>8.3f} "
+                  f"{seconds['numpy'] / seconds['numba']:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+"""
+N-body gravity for the notebook Simulación_de_los_tres_cuerpos.ipynb.
+
+A system of N bodies is three arrays: positions and velocities of shape (N, 3)
+and masses of shape (N,). The accelerations of all the bodies come from one
+broadcast over every pair, so a step costs the same handful of array
+operations whether there are 2, 3 or 4 bodies.
+
+Integrators (the `method` of simulate):
+    euler     explicit Euler, the notebook's original scheme (1st order)
+    leapfrog  velocity Verlet, symplectic (2nd order, 1 force evaluation per step)
+    yoshida4  Yoshida's composition of three leapfrog steps (4th order, 3 per step)
+    rk45      Dormand-Prince 5(4) with adaptive steps (needs SciPy)
+    dop853    Dormand-Prince 8(5,3) with adaptive steps (needs SciPy)
+The symplectic methods keep the energy error bounded over long runs; the
+adaptive ones pick their own steps, short at close encounters and long
+elsewhere, and only interpolate at the output times.
+
+With Numba installed, the fixed-step methods run their whole time loop as
+compiled code (backend="numba", or "auto" to use it when available); the
+NumPy implementation is the reference and the fallback.
+
+Long runs need not be held in memory: trajectory yields the path in pieces,
+keeping one row every `stride` steps, and write_trajectory streams it into a
+memory-mapped .npy file (or HDF5 / Zarr) that plots read through decimate.
+
+For sensitivity studies, sweep builds an ensemble of M perturbed copies of a
+system, (M, N, 3) positions and velocities, and ensemble integrates it in
+chunks over a process pool, keeping only the final states.
+
+Units are the notebook's: the gravitational constant is G = 9.8.
+"""
+import multiprocessing as mp
+import os
+
+import numpy as np
+
+G = 9.8
+
+
+def as_system(positions, velocities, masses):
+    """Float arrays (N, 3), (N, 3) and (N,) from the starting vectors and masses of the bodies."""
+    positions = np.array(positions, dtype=np.float64)
+    velocities = np.array(velocities, dtype=np.float64)
+    masses = np.array(masses, dtype=np.float64)
+    if positions.shape != velocities.shape or positions.shape[-1] != 3:
+        raise ValueError(f"Positions and velocities must both be (N, 3), not {positions.shape} and {velocities.shape}")
+    if masses.shape != positions.shape[:-1]:
+        raise ValueError(f"Expected {positions.shape[-2]} masses, got shape {masses.shape}")
+    return positions, velocities, masses
+
+
+def accelerations(positions, masses, g=G):
+    """
+    Acceleration of every body, shape (N, 3): the sum over the other bodies j
+    of g * m_j * (p_j - p_i) / |p_j - p_i|^3.
+    """
+    separations = positions[..., None, :, :] - positions[..., :, None, :]  # [i, j] = p_j - p_i
+    distance2 = np.einsum("...k,...k->...", separations, separations)
+    bodies = np.arange(positions.shape[-2])
+    distance2[..., bodies, bodies] = np.inf  # a body does not pull on itself
+    weights = masses[..., None, :] * distance2 ** -1.5
+    return g * np.einsum("...ij,...ijk->...ik", weights, separations)
+
+
+def energy(positions, velocities, masses, g=G):
+    """
+    Total energy, kinetic plus potential, of the system. Leading axes are kept:
+    the energy of a whole (steps, N, 3) trajectory is an array of `steps` values.
+    """
+    kinetic = 0.5 * np.sum(masses[..., None] * velocities ** 2, axis=(-2, -1))
+    i, j = np.triu_indices(positions.shape[-2], 1)
+    distances = np.linalg.norm(positions[..., i, :] - positions[..., j, :], axis=-1)
+    potential = -g * np.sum(masses[..., i] * masses[..., j] / distances, axis=-1)
+    return kinetic + potential
+
+
+# ----- Fixed-step integrators -----
+# A step takes the state and the acceleration at its positions, and returns
+# the next state with its acceleration, so no force is computed twice.
+
+def euler_step(positions, velocities, acceleration, masses, delta_t, g=G):
+    """One explicit Euler step, as in the notebook: both updates use the old state."""
+    positions = positions + velocities * delta_t
+    velocities = velocities + acceleration * delta_t
+    return positions, velocities, accelerations(positions, masses, g)
+
+
+def leapfrog_step(positions, velocities, acceleration, masses, delta_t, g=G):
+    """One velocity Verlet step: half kick, drift, half kick with the new acceleration."""
+    velocities = velocities + acceleration * (delta_t / 2)
+    positions = positions + velocities * delta_t
+    acceleration = accelerations(positions, masses, g)
+    return positions, velocities + acceleration * (delta_t / 2), acceleration
+
+
+# Three leapfrog steps of w1, w0, w1 times delta_t cancel the third-order error.
+_CBRT2 = 2 ** (1 / 3)
+YOSHIDA_WEIGHTS = (1 / (2 - _CBRT2), -_CBRT2 / (2 - _CBRT2), 1 / (2 - _CBRT2))
+
+
+def yoshida4_step(positions, velocities, acceleration, masses, delta_t, g=G):
+    """One fourth-order Yoshida step (the middle leapfrog step goes backwards in time)."""
+    for weight in YOSHIDA_WEIGHTS:
+        positions, velocities, acceleration = leapfrog_step(
+            positions, velocities, acceleration, masses, weight * delta_t, g)
+    return positions, velocities, acceleration
+
+
+STEPPERS = {"euler": euler_step, "leapfrog": leapfrog_step, "yoshida4": yoshida4_step}
+ADAPTIVE = {"rk45": "RK45", "dop853": "DOP853"}  # SciPy solve_ivp method names
+METHODS = list(STEPPERS) + list(ADAPTIVE)
+BACKENDS = ["auto", "numpy", "numba"]
+
+
+# ----- Compiled backend -----
+# The loops below are written for Numba: scalar arithmetic on small arrays, no
+# temporaries. build_kernel(numba.njit) compiles them; build_kernel(lambda f: f)
+# gives the same code as plain (slow) Python.
+
+# Leapfrog steps per step and their weights; an empty list means Euler.
+KERNEL_WEIGHTS = {"euler": [], "leapfrog": [1.0], "yoshida4": list(YOSHIDA_WEIGHTS)}
+
+
+def build_kernel(jit):
+    """
+    Return the loops (forces, fill, final):
+        forces(x, masses, g, out) writes the accelerations at positions x to out;
+        fill(p, v, x, u, a, masses, delta_t, g, weights, stride, start) advances the
+            state x, u (with acceleration a) in place and writes it to rows start..
+            of p and v, one row every `stride` steps;
+        final(x, u, masses, delta_t, g, weights, steps) advances every system of an
+            (M, N, 3) ensemble in place by steps - 1 steps.
+    """
+
+    @jit
+    def forces(x, masses, g, out):
+        out[:] = 0.0
+        bodies = x.shape[0]
+        for i in range(bodies):
+            for j in range(i + 1, bodies):
+                dx = x[j, 0] - x[i, 0]
+                dy = x[j, 1] - x[i, 1]
+                dz = x[j, 2] - x[i, 2]
+                distance2 = dx * dx + dy * dy + dz * dz
+                pull = g / (distance2 * np.sqrt(distance2))
+                out[i, 0] += masses[j] * pull * dx
+                out[i, 1] += masses[j] * pull * dy
+                out[i, 2] += masses[j] * pull * dz
+                out[j, 0] -= masses[i] * pull * dx
+                out[j, 1] -= masses[i] * pull * dy
+                out[j, 2] -= masses[i] * pull * dz
+
+    @jit
+    def advance(x, u, a, masses, delta_t, g, weights):
+        bodies = x.shape[0]
+        if weights.shape[0] == 0:
+            for i in range(bodies):
+                for k in range(3):
+                    x[i, k] += u[i, k] * delta_t
+                    u[i, k] += a[i, k] * delta_t
+            forces(x, masses, g, a)
+        for weight in weights:
+            h = weight * delta_t
+            for i in range(bodies):
+                for k in range(3):
+                    u[i, k] += a[i, k] * (h / 2)
+                    x[i, k] += u[i, k] * h
+            forces(x, masses, g, a)
+            for i in range(bodies):
+                for k in range(3):
+                    u[i, k] += a[i, k] * (h / 2)
+
+    @jit
+    def fill(p, v, x, u, a, masses, delta_t, g, weights, stride, start):
+        for row in range(start, p.shape[0]):
+            for _ in range(stride):
+                advance(x, u, a, masses, delta_t, g, weights)
+            p[row] = x
+            v[row] = u
+
+    @jit
+    def final(x, u, masses, delta_t, g, weights, steps):
+        a = np.empty(x.shape[1:])
+        for system in range(x.shape[0]):
+            forces(x[system], masses[system], g, a)
+            for _ in range(steps - 1):
+                advance(x[system], u[system], a, masses[system], delta_t, g, weights)
+
+    return forces, fill, final
+
+
+_numba_loops = None
+
+
+def numba_kernel():
+    """
+    The Numba-compiled loops of build_kernel, or None without Numba. They are
+    compiled on first use, which takes a few seconds once per session.
+    """
+    global _numba_loops
+    if _numba_loops is None:
+        try:
+            import numba
+        except ImportError:
+            return None
+        _numba_loops = build_kernel(numba.njit)
+    return _numba_loops
+
+
+def _compiled_loops(method, backend):
+    """Check method and backend; returns the compiled loops to use, or None for NumPy or SciPy."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}; expected one of {', '.join(METHODS)}")
+    if method in ADAPTIVE or backend == "numpy":
+        return None
+    loops = numba_kernel()
+    if loops is None and backend == "numba":
+        raise ImportError("The numba backend needs Numba (pip install numba); use backend='numpy' instead")
+    return loops
+
+
+def solve_adaptive(positions, velocities, masses, times, method="dop853", rtol=1e-10, atol=1e-10, g=G):
+    """
+    Integrate with an adaptive Runge-Kutta method of SciPy and return (p, v)
+    at `times`, shape (len(times), N, 3). The solver chooses its own steps to
+    keep the local error within rtol and atol; `times` only sets the output.
+    """
+    try:
+        from scipy.integrate import solve_ivp
+    except ImportError:
+        raise ImportError(f"The {method} integrator needs SciPy (pip install scipy); "
+                          f"use one of {', '.join(STEPPERS)} instead") from None
+    shape = positions.shape
+
+    def derivatives(t, state):
+        p, v = state.reshape((2,) + shape)
+        return np.concatenate((v, accelerations(p, masses, g)), axis=None)
+
+    start = np.concatenate((positions, velocities), axis=None)
+    solution = solve_ivp(derivatives, (times[0], times[-1]), start, method=ADAPTIVE[method],
+                         t_eval=times, rtol=rtol, atol=atol)
+    if not solution.success:
+        raise RuntimeError(f"{method} failed: {solution.message}")
+    states = solution.y.T.reshape((len(times), 2) + shape)
+    return states[:, 0], states[:, 1]
+
+
+def trajectory(positions, velocities, masses, delta_t=0.001, steps=200000, g=G, method="euler",
+               rtol=1e-10, atol=1e-10, backend="auto", stride=1, chunk=10000):
+    """
+    Integrate like simulate, but yield the trajectory in pieces: (p, v) pairs
+    of up to `chunk` rows, (rows, N, 3), keeping one row every `stride` steps
+    (rows 0, stride, 2 * stride, ... of simulate). Only one piece is in memory
+    at a time, however long the run.
+
+    The arguments are checked here, before the first piece is asked for.
+    """
+    for name, value in (("steps", steps), ("stride", stride), ("chunk", chunk)):
+        if value < 1:
+            raise ValueError(f"{name} must be at least 1, got {value}")
+    positions, velocities, masses = as_system(positions, velocities, masses)
+    loops = _compiled_loops(method, backend)
+    return _pieces(positions, velocities, masses, delta_t, steps, g, method, rtol, atol, loops, stride, chunk)
+
+
+def _pieces(x, u, masses, delta_t, steps, g, method, rtol, atol, loops, stride, chunk):
+    """The generator behind trajectory."""
+    rows = len(range(0, steps, stride))
+    if loops is not None:
+        forces, fill, _ = loops
+        a = np.empty_like(x)
+        forces(x, masses, float(g), a)
+        weights = np.array(KERNEL_WEIGHTS[method], dtype=np.float64)
+    elif method in STEPPERS:
+        advance = STEPPERS[method]
+        a = accelerations(x, masses, g)
+
+    done = 0
+    while done < rows:
+        count = min(chunk, rows - done)
+        p = np.empty((count,) + x.shape)
+        v = np.empty((count,) + u.shape)
+        start = 0
+        if done == 0:
+            p[0], v[0] = x, u
+            start = 1
+        if loops is not None:
+            fill(p, v, x, u, a, masses, float(delta_t), float(g), weights, stride, start)
+        elif method in STEPPERS:
+            for row in range(start, count):
+                for _ in range(stride):
+                    x, u, a = advance(x, u, a, masses, delta_t, g)
+                p[row], v[row] = x, u
+        elif count > start:
+            # One solver run per piece, from the last row of the previous one.
+            times = np.arange(done + start - 1, done + count) * (stride * delta_t)
+            p_rows, v_rows = solve_adaptive(x, u, masses, times, method, rtol, atol, g)
+            p[start:], v[start:] = p_rows[1:], v_rows[1:]
+            x, u = p[-1].copy(), v[-1].copy()
+        done += count
+        yield p, v
+
+
+def simulate(positions, velocities, masses, delta_t=0.001, steps=200000, g=G, method="euler",
+             rtol=1e-10, atol=1e-10, backend="auto", stride=1):
+    """
+    Integrate from the starting state and return the trajectories (p, v), two
+    arrays of shape (steps, N, 3) whose first row is the starting state.
+    p[:, 0] is the path of the first body, p[-1] the final positions. With
+    `stride`, only every stride-th row is kept.
+
+    Rows are delta_t apart. The fixed-step methods also step by delta_t; the
+    adaptive ones (rk45, dop853) step as rtol and atol require, always through
+    SciPy. `backend` picks how the fixed-step methods run: "numpy", "numba",
+    or "auto" for Numba when it is installed. Both give the same trajectories
+    up to rounding.
+    """
+    return next(trajectory(positions, velocities, masses, delta_t, steps, g, method, rtol, atol, backend,
+                           stride, chunk=steps))
+
+
+def write_trajectory(path, positions, velocities, masses, delta_t=0.001, steps=200000, stride=1, chunk=10000,
+                     **options):
+    """
+    Integrate (see trajectory; `options` are its method, backend, ...) and
+    write every piece to `path` as soon as it is computed, so memory stays at
+    one piece. The file holds one (rows, 2, N, 3) array: [:, 0] are positions,
+    [:, 1] velocities. By extension:
+        .npy            a NumPy file, written through np.lib.format.open_memmap
+        .h5 or .hdf5    dataset "trajectory" of an HDF5 file (needs h5py)
+        .zarr           a Zarr array (needs zarr)
+    Returns the array opened read-only with open_trajectory.
+    """
+    positions, velocities, masses = as_system(positions, velocities, masses)
+    shape = (len(range(0, steps, stride)), 2) + positions.shape
+    # Bad arguments (steps, method, backend, ...) raise here, before the file is created.
+    pieces = trajectory(positions, velocities, masses, delta_t, steps, stride=stride, chunk=chunk, **options)
+    chunks = (min(chunk, shape[0]),) + shape[1:]
+    store = None
+    if path.lower().endswith(".npy"):
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=shape)
+    elif path.lower().endswith((".h5", ".hdf5")):
+        store = _optional("h5py", "an HDF5 file").File(path, "w")
+        out = store.create_dataset("trajectory", shape=shape, dtype=np.float64, chunks=chunks)
+        out.attrs["row_time"] = delta_t * stride
+    elif path.lower().endswith(".zarr"):
+        out = _optional("zarr", "a Zarr store").open_array(path, mode="w", shape=shape, chunks=chunks,
+                                                           dtype=np.float64)
+        out.attrs["row_time"] = delta_t * stride
+    else:
+        raise ValueError(f"Unknown trajectory format {path!r}; use .npy, .h5, .hdf5 or .zarr")
+
+    row = 0
+    try:
+        for p, v in pieces:
+            out[row:row + len(p), 0] = p
+            out[row:row + len(p), 1] = v
+            row += len(p)
+    finally:
+        if store is not None:
+            store.close()
+        elif isinstance(out, np.memmap):
+            out.flush()
+    return open_trajectory(path)
+
+
+def open_trajectory(path):
+    """Open a trajectory written by write_trajectory, read-only and without loading it."""
+    if path.lower().endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    if path.lower().endswith((".h5", ".hdf5")):
+        return _optional("h5py", "an HDF5 file").File(path, "r")["trajectory"]
+    if path.lower().endswith(".zarr"):
+        return _optional("zarr", "a Zarr store").open_array(path, mode="r")
+    raise ValueError(f"Unknown trajectory format {path!r}; use .npy, .h5, .hdf5 or .zarr")
+
+
+def decimate(rows, points=50000):
+    """
+    At most about `points` evenly spaced rows of a long array, a stored
+    trajectory or one of its slices, for plotting; only those rows are read.
+    """
+    return rows[::max(1, -(-len(rows) // points))]
+
+
+def _optional(module, what):
+    try:
+        return __import__(module)
+    except ImportError:
+        raise ImportError(f"Writing or reading {what} needs {module} (pip install {module}); "
+                          f"use a .npy path instead") from None
+
+
+# ----- Ensembles -----
+# M variations of one system integrated together: positions and velocities
+# (M, N, 3) and masses (M, N). Only the final state is kept.
+
+def integrate(positions, velocities, masses, delta_t=0.001, steps=200000, g=G, method="euler",
+              rtol=1e-10, atol=1e-10, backend="auto"):
+    """
+    Final positions and velocities, (M, N, 3), of an ensemble after the same
+    steps - 1 steps of delta_t that simulate takes. With NumPy every step
+    advances all the systems in one set of array operations; the adaptive
+    methods share one step size, set by the hardest system of the ensemble.
+    """
+    positions, velocities, masses = as_system(positions, velocities, masses)
+    loops = _compiled_loops(method, backend)
+    if method in ADAPTIVE:
+        p, v = solve_adaptive(positions, velocities, masses, np.array([0.0, (steps - 1) * delta_t]),
+                              method, rtol, atol, g)
+        return p[-1], v[-1]
+    if loops is not None:
+        _, _, final = loops
+        final(positions, velocities, masses, float(delta_t), float(g),
+              np.array(KERNEL_WEIGHTS[method], dtype=np.float64), steps)
+        return positions, velocities
+    advance = STEPPERS[method]
+    acceleration = accelerations(positions, masses, g)
+    for _ in range(steps - 1):
+        positions, velocities, acceleration = advance(positions, velocities, acceleration, masses, delta_t, g)
+    return positions, velocities
+
+
+def _integrate_chunk(task):
+    positions, velocities, masses, options = task
+    return integrate(positions, velocities, masses, **options)
+
+
+def ensemble(positions, velocities, masses, delta_t=0.001, steps=200000, g=G, method="euler",
+             rtol=1e-10, atol=1e-10, backend="auto", workers=None, chunk=256):
+    """
+    Integrate an ensemble (see sweep) in chunks of `chunk` systems spread over
+    `workers` processes (default: one per CPU) and return the final positions
+    and velocities, (M, N, 3). Each system evolves on its own, so the result
+    does not depend on the chunks or the number of workers (except for the
+    adaptive methods, whose step size is shared within a chunk).
+    """
+    positions, velocities, masses = as_system(positions, velocities, masses)
+    if positions.ndim != 3:
+        raise ValueError(f"An ensemble is (M, N, 3) positions and velocities, not {positions.shape}")
+    _compiled_loops(method, backend)  # check the options here rather than in every worker
+    options = {"delta_t": delta_t, "steps": steps, "g": g, "method": method, "rtol": rtol, "atol": atol,
+               "backend": backend}
+    tasks = [(positions[start:start + chunk], velocities[start:start + chunk], masses[start:start + chunk], options)
+             for start in range(0, len(positions), chunk)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        results = [_integrate_chunk(task) for task in tasks]
+    else:
+        with mp.get_context().Pool(workers) as pool:
+            results = pool.map(_integrate_chunk, tasks)
+    return (np.concatenate([p for p, _ in results]) if results else positions,
+            np.concatenate([v for _, v in results]) if results else velocities)
+
+
+def sweep(positions, velocities, masses, body=0, delta_v=(0.0,), directions=((1, 0, 0),), mass_scales=(1.0,)):
+    """
+    Perturbed copies of one system: every combination of a speed change from
+    `delta_v` along one of `directions` (normalized) added to the velocity of
+    `body`, and a factor from `mass_scales` on its mass.
+
+    Returns (positions, velocities, masses, parameters): an ensemble of
+    M = len(delta_v) * len(directions) * len(mass_scales) systems, and the
+    columns "delta_v", "direction" and "mass_scale" with the M values used.
+    """
+    positions, velocities, masses = as_system(positions, velocities, masses)
+    directions = np.array(directions, dtype=np.float64).reshape(-1, 3)
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+    speed, direction, scale = (a.ravel() for a in np.meshgrid(
+        np.asarray(delta_v, dtype=np.float64), np.arange(len(directions)),
+        np.asarray(mass_scales, dtype=np.float64), indexing="ij"))
+    count = len(speed)
+    ensemble_positions = np.repeat(positions[None], count, axis=0)
+    ensemble_velocities = np.repeat(velocities[None], count, axis=0)
+    ensemble_masses = np.repeat(masses[None], count, axis=0)
+    ensemble_velocities[:, body] += speed[:, None] * directions[direction]
+    ensemble_masses[:, body] *= scale
+    parameters = {"delta_v": speed, "direction": directions[direction], "mass_scale": scale}
+    return ensemble_positions, ensemble_velocities, ensemble_masses, parameters
+
+
+def final_columns(positions, velocities):
+    """
+    Columns p1_final, v1_final, p2_final, ... of the notebook's results table
+    (three_body_simulation_data.csv), one 3-vector per system of the ensemble.
+    """
+    columns = {}
+    for body in range(positions.shape[-2]):
+        columns[f"p{body + 1}_final"] = list(positions[:, body])
+        columns[f"v{body + 1}_final"] = list(velocities[:, body])
+    return columns
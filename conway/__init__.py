@@ -0,0 +1 @@
+"""Conway's Game of Life variants; `python -m conway.run` runs simulations without a display."""
@@ -1,6 +1,10 @@
 import pygame
 import numpy as np
 
+from life.engine import step
+from life.render import GridRenderer
+from life.rules import parse_rule
+
 class Tablero:
     # Parámetros de la pantalla y del tablero
     ancho, alto = 700, 400         # Dimensiones totales de la ventana
@@ -9,6 +13,7 @@ class Tablero:
     cantidad_ancho = 0             # Cantidad de celdas en dirección horizontal
     cantidad_alto = 0              # Cantidad de celdas en dirección vertical
     velocidad = 10                 # Velocidad (fps)
+    regla = parse_rule("B3/S23")  # Regla del autómata (nacimiento/supervivencia)
 
     # Matrices del autómata
     tablero_inicial = None
@@ -20,6 +25,8 @@ class Tablero:
 
     clock = None       # Controlador de tiempo de pygame
     pantalla = None    # Superficie de dibujo
+    _capa_fija = None  # Cuadrícula, botones y textos ya dibujados (ver capa_fija)
+    pintor = None      # GridRenderer de las celdas
 
     # Botones de la interfaz
     boton_inicio = None
@@ -29,6 +36,7 @@ class Tablero:
     # Variables para el reloj digital
     hours = 0
     minutes = 0
+    _sello_reloj = None  # ((hours, minutes), sello) del último sello_reloj
 
     # Patrón para cada dígito (matriz 5x3) – se usarán para inyectar el reloj
     digit_patterns = {
@@ -84,6 +92,9 @@ class Tablero:
                        [1,1,1]])
     }
 
+    # Los mismos patrones transpuestos (3x5), listos para copiarse en el tablero indexado [x, y]
+    digit_stamps = {digito: patron.T for digito, patron in digit_patterns.items()}
+
     # Posiciones (en índice de celdas) donde se mostrarán los dígitos.
     # Importante: en este tablero, la matriz "tablero_general" se indexa como [i, j]
     # donde "i" representa la posición horizontal (x) y "j" la vertical (y).
@@ -111,6 +122,7 @@ class Tablero:
         pygame.display.set_caption("Conway's Game of Life - Reloj Digital")
         self.clock = pygame.time.Clock()
         self.pantalla = pygame.display.set_mode((self.ancho, self.alto))
+        self.pintor = GridRenderer((27, 140, 255), (53, 53, 53), columns_first=True)
         # Inicializamos el tablero con todas las celdas muertas
         self.tablero_inicial = np.zeros((self.cantidad_ancho, self.cantidad_alto))
         self.tablero_general = np.copy(self.tablero_inicial)
@@ -129,43 +141,66 @@ class Tablero:
         Inyecta el patrón del dígito (5x3) en 'tablero_general' a partir de la posición top_left.
         top_left es una tupla (x, y) en índice de celdas.
         """
-        pattern = self.digit_patterns[digit]
-        rows, cols = pattern.shape  # rows: vertical, cols: horizontal
-        for r in range(rows):
-            for c in range(cols):
-                # En la matriz, el primer índice es la posición horizontal (x) y el segundo la vertical (y)
-                self.tablero_general[top_left[0] + c, top_left[1] + r] = pattern[r, c]
+        # En la matriz, el primer índice es la posición horizontal (x) y el segundo la vertical (y),
+        # por eso se copia el patrón ya transpuesto (3x5)
+        sello = self.digit_stamps[digit]
+        x, y = top_left
+        self.tablero_general[x:x + sello.shape[0], y:y + sello.shape[1]] = sello
 
     def imprint_colon(self, top_left):
         """
         Inyecta el ":" en 'tablero_general'. Se activan dos celdas: una en top_left y otra dos celdas más abajo.
         """
-        self.tablero_general[top_left[0], top_left[1]] = 1
-        self.tablero_general[top_left[0], top_left[1] + 2] = 1
+        x, y = top_left
+        self.tablero_general[x, y:y + 3:2] = 1
 
-    def overlay_clock(self):
+    def sello_reloj(self):
         """
-        Limpia la zona donde se muestran los dígitos y luego inyecta los patrones correspondientes
-        según la hora actual (self.hours y self.minutes).
+        Devuelve (zona, propias, valores) para la hora actual: 'zona' es el rectángulo del tablero
+        que contiene el reloj, 'propias' marca las celdas que pertenecen al reloj y 'valores' su estado.
+        Sólo se recalcula cuando cambian self.hours o self.minutes.
         """
-        # Limpiar áreas de cada dígito (cada dígito ocupa 3 columnas x 5 filas)
-        for pos in self.digit_positions.values():
-            for c in range(3):
-                for r in range(5):
-                    self.tablero_general[pos[0] + c, pos[1] + r] = 0
-        # Limpiar área del colon (se asume 1 columna x 3 filas)
-        x, y = self.colon_position
-        for r in range(3):
-            self.tablero_general[x, y + r] = 0
+        clave = (self.hours, self.minutes)
+        if self._sello_reloj is not None and self._sello_reloj[0] == clave:
+            return self._sello_reloj[1]
+
+        # Rectángulo que cubre los cuatro dígitos (3 columnas x 5 filas) y el colon (1 columna x 3 filas)
+        esquinas = list(self.digit_positions.values()) + [self.colon_position]
+        x0 = min(x for x, _ in esquinas)
+        y0 = min(y for _, y in esquinas)
+        x1 = max(x for x, _ in esquinas) + 3
+        y1 = max(y for _, y in esquinas) + 5
+        propias = np.zeros((x1 - x0, y1 - y0), dtype=bool)
+        valores = np.zeros((x1 - x0, y1 - y0), dtype=self.tablero_general.dtype)
 
-        # Convertir la hora actual a dos dígitos
         hour_str = f"{self.hours:02d}"
         minute_str = f"{self.minutes:02d}"
-        self.imprint_digit(hour_str[0], self.digit_positions["hour_tens"])
-        self.imprint_digit(hour_str[1], self.digit_positions["hour_ones"])
-        self.imprint_digit(minute_str[0], self.digit_positions["minute_tens"])
-        self.imprint_digit(minute_str[1], self.digit_positions["minute_ones"])
-        self.imprint_colon(self.colon_position)
+        digitos = {
+            "hour_tens": hour_str[0],
+            "hour_ones": hour_str[1],
+            "minute_tens": minute_str[0],
+            "minute_ones": minute_str[1],
+        }
+        for nombre, digito in digitos.items():
+            x, y = self.digit_positions[nombre]
+            propias[x - x0:x - x0 + 3, y - y0:y - y0 + 5] = True
+            valores[x - x0:x - x0 + 3, y - y0:y - y0 + 5] = self.digit_stamps[digito]
+        x, y = self.colon_position
+        propias[x - x0, y - y0:y - y0 + 3] = True
+        valores[x - x0, y - y0:y - y0 + 3] = [1, 0, 1]
+
+        sello = ((slice(x0, x1), slice(y0, y1)), propias, valores)
+        self._sello_reloj = (clave, sello)
+        return sello
+
+    def overlay_clock(self):
+        """
+        Limpia la zona donde se muestran los dígitos y luego inyecta los patrones correspondientes
+        según la hora actual (self.hours y self.minutes).
+        """
+        # Una sola asignación: sólo se escriben las celdas que pertenecen al reloj
+        zona, propias, valores = self.sello_reloj()
+        self.tablero_general[zona][propias] = valores[propias]
 
     def update_clock(self):
         """
@@ -184,57 +219,52 @@ class Tablero:
         Aplica las reglas del Juego de la Vida y actualiza el reloj.
         Se calcula la cantidad de vecinos para cada celda y se actualiza el estado.
         """
-        tablero_nuevo = np.zeros_like(self.tablero_general)
-        for i in range(1, self.cantidad_ancho - 1):
-            for j in range(1, self.cantidad_alto - 1):
-                # Calcular vecinos (suma de la vecindad menos la celda actual)
-                cantidad_vecinos = np.sum(self.tablero_general[i-1:i+2, j-1:j+2]) - self.tablero_general[i, j]
-                if self.tablero_general[i, j] == 1 and (cantidad_vecinos < 2 or cantidad_vecinos > 3):
-                    tablero_nuevo[i, j] = 0
-                elif self.tablero_general[i, j] == 0 and cantidad_vecinos == 3:
-                    tablero_nuevo[i, j] = 1
-                else:
-                    tablero_nuevo[i, j] = self.tablero_general[i, j]
+        # El tablero no es toroidal: fuera de él todo cuenta como muerto y el borde se mantiene vacío
+        tablero_nuevo = step(self.tablero_general, self.regla, wrap=False)
+        tablero_nuevo[:1, :] = 0
+        tablero_nuevo[-1:, :] = 0
+        tablero_nuevo[:, :1] = 0
+        tablero_nuevo[:, -1:] = 0
         self.tablero_general = tablero_nuevo
         # Actualizar el reloj (se incrementa un "tic" en cada actualización)
         self.update_clock()
         # Inyectar (o actualizar) los dígitos del reloj en la cuadrícula
         self.overlay_clock()
 
+    def capa_fija(self):
+        """
+        Superficie transparente con lo que no cambia entre cuadros: líneas de la cuadrícula,
+        botones y sus textos. Se construye una sola vez.
+        """
+        if self._capa_fija is not None:
+            return self._capa_fija
+        capa = pygame.Surface((self.ancho, self.alto), pygame.SRCALPHA)
+        # Dibujar líneas de la cuadrícula
+        for i in range(0, self.cantidad_ancho * self.celdas, self.celdas):
+            pygame.draw.line(capa, (210, 210, 210), (i, 0), (i, self.alto))
+        for j in range(0, self.cantidad_alto * self.celdas, self.celdas):
+            pygame.draw.line(capa, (210, 210, 210), (0, j), (self.cantidad_ancho * self.celdas, j))
+        # Dibujar los botones (en la parte derecha)
+        pygame.draw.rect(capa, (101, 248, 161), self.boton_inicio)
+        pygame.draw.rect(capa, (255, 93, 72), self.boton_borrar)
+        pygame.draw.rect(capa, (72, 187, 255), self.boton_pasos)
+        # Dibujar textos en los botones (la fuente se crea una sola vez)
+        fuente = pygame.font.Font(None, 35)
+        capa.blit(fuente.render("Inicio", True, (0, 0, 0)), (self.ancho - 83, 15))
+        capa.blit(fuente.render("Borrar", True, (0, 0, 0)), (self.ancho - 87, 55))
+        capa.blit(fuente.render("Pasos", True, (0, 0, 0)), (self.ancho - 86, 95))
+        self._capa_fija = capa
+        return capa
+
     def dibujar_cuadricula(self):
         
         # Actualizamos la zona del reloj antes de dibujar
         self.overlay_clock()
         self.pantalla.fill((44, 44, 44))
-        # Dibujar cada celda del tablero
-        for i in range(self.cantidad_ancho):
-            for j in range(self.cantidad_alto):
-                if self.tablero_general[i, j] == 1:
-                    pygame.draw.rect(self.pantalla, (27, 140, 255),
-                                     (i * self.celdas, j * self.celdas, self.celdas, self.celdas))
-                else:
-                    pygame.draw.rect(self.pantalla, (53, 53, 53),
-                                     (i * self.celdas, j * self.celdas, self.celdas, self.celdas))
-        # Dibujar líneas de la cuadrícula
-        for i in range(0, self.cantidad_ancho * self.celdas, self.celdas):
-            pygame.draw.line(self.pantalla, (210, 210, 210), (i, 0), (i, self.alto))
-        for j in range(0, self.cantidad_alto * self.celdas, self.celdas):
-            pygame.draw.line(self.pantalla, (210, 210, 210), (0, j), (self.cantidad_ancho * self.celdas, j))
-        # Dibujar los botones (en la parte derecha)
-        pygame.draw.rect(self.pantalla, (101, 248, 161), self.boton_inicio)
-        pygame.draw.rect(self.pantalla, (255, 93, 72), self.boton_borrar)
-        pygame.draw.rect(self.pantalla, (72, 187, 255), self.boton_pasos)
-
-        # Dibujar textos en los botones
-        font1 = pygame.font.Font(None, 35)
-        font2 = pygame.font.Font(None, 35)
-        font3 = pygame.font.Font(None, 35)
-        texto_inicio = font1.render("Inicio", True, (0, 0, 0))
-        texto_borrar = font2.render("Borrar", True, (0, 0, 0))
-        texto_pasos = font3.render("Pasos", True, (0, 0, 0))
-        self.pantalla.blit(texto_inicio, (self.ancho - 83, 15))
-        self.pantalla.blit(texto_borrar, (self.ancho - 87, 55))
-        self.pantalla.blit(texto_pasos, (self.ancho - 86, 95))
+        # Dibujar todas las celdas del tablero con un solo blit (el tablero se indexa [x, y])
+        self.pintor.draw(self.pantalla, self.tablero_general, 0, 0, self.celdas)
+        # Líneas, botones y textos
+        self.pantalla.blit(self.capa_fija(), (0, 0))
 
         pygame.display.flip()
 
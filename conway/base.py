@@ -2,6 +2,16 @@ import os
 import pygame
 import numpy as np
 
+from life.cycles import CycleDetector, grid_digest
+from life.engine import step
+from life.history import History
+from life.patterns import iter_pattern, write_pattern
+from life.render import GridRenderer
+from life.rules import parse_rule
+from life.snapshot import load_snapshot, save_snapshot
+from life.tiles import TiledStepper
+from life.worker import SimulationWorker
+
 # Initialize Pygame
 pygame.init()
 
@@ -10,8 +20,16 @@ WIDTH, HEIGHT = 1200, 800
 CELL_SIZE = 10
 GRID_WIDTH = WIDTH // CELL_SIZE
 GRID_HEIGHT = HEIGHT // CELL_SIZE
-FPS = 10
+FPS = 10  # Frames drawn per second
+STEPS_PER_SECOND = 10  # Generations simulated per second, independent of FPS
 CHARGEFILE = "pattern.txt"
+SNAPSHOTFILE = "board.snap"  # Binary checkpoint written with S and read back with L
+HISTORYFILE = "history.gif"  # Animation of the recorded history written with G
+HISTORY_MEGABYTES = 64  # Memory kept for rewinding with the arrow keys
+PAUSE_ON_CYCLE = False  # Pause once the board repeats an earlier generation (still life, oscillator)
+RULE = parse_rule("B3/S23")
+USE_TILED_ENGINE = False  # Only recompute the 64x64 tiles that changed (large, mostly settled boards)
+MIN_CELL_SIZE = 5  # Use a fraction (e.g. 1 / 8) to zoom out past one pixel per cell on large boards
 
 # Colors
 BLACK = (0, 0, 0)
@@ -20,6 +38,7 @@ WHITE = (255, 255, 255)
 # Initialize screen
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Conway's Game of Life")
+renderer = GridRenderer(WHITE, BLACK)
 
 # Utility: get the absolute path for the pattern file in the same directory as the script.
 def get_pattern_file_path(filename="pattern.txt"):
@@ -32,47 +51,17 @@ def create_grid():
 
 def draw_grid(grid, offset_x, offset_y, cell_size):
     screen.fill(BLACK)
-    for y in range(grid.shape[0]):
-        for x in range(grid.shape[1]):
-            if grid[y, x] == 1:
-                pygame.draw.rect(
-                    screen, WHITE,
-                    ((x * cell_size) + offset_x, (y * cell_size) + offset_y, cell_size, cell_size)
-                )
+    renderer.draw(screen, grid, offset_x, offset_y, cell_size)
 
 def update_grid(grid):
-    new_grid = np.copy(grid)
-    for y in range(grid.shape[0]):
-        for x in range(grid.shape[1]):
-            # Count live neighbors
-            neighbors = (
-                grid[(y - 1) % grid.shape[0], (x - 1) % grid.shape[1]]
-                + grid[(y - 1) % grid.shape[0], x % grid.shape[1]]
-                + grid[(y - 1) % grid.shape[0], (x + 1) % grid.shape[1]]
-                + grid[y % grid.shape[0], (x - 1) % grid.shape[1]]
-                + grid[y % grid.shape[0], (x + 1) % grid.shape[1]]
-                + grid[(y + 1) % grid.shape[0], (x - 1) % grid.shape[1]]
-                + grid[(y + 1) % grid.shape[0], x % grid.shape[1]]
-                + grid[(y + 1) % grid.shape[0], (x + 1) % grid.shape[1]]
-            )
-
-            # Apply rules
-            if grid[y, x] == 1:
-                if neighbors < 2 or neighbors > 3:
-                    new_grid[y, x] = 0
-            elif grid[y, x] == 0 and neighbors == 3:
-                new_grid[y, x] = 1
-
-    return new_grid
+    return step(grid, RULE)
 
 def save_pattern(grid, filename="pattern.txt"):
     """Export live cell coordinates to a text file in the same directory as the script."""
     path = get_pattern_file_path(filename)
-    with open(path, "w") as f:
-        for y in range(grid.shape[0]):
-            for x in range(grid.shape[1]):
-                if grid[y, x] == 1:
-                    f.write(f"{x} {y}\n")
+    ys, xs = np.nonzero(grid == 1)
+    # The extension picks the format: .rle (with the rule), .lif, .cells, or "x y" lines.
+    write_pattern(path, xs, ys, RULE)
     print(f"Pattern saved to {path}")
 
 def load_pattern(grid, filename=CHARGEFILE, offset=(0,0)):
@@ -80,24 +69,81 @@ def load_pattern(grid, filename=CHARGEFILE, offset=(0,0)):
     path = get_pattern_file_path(filename)
     offset_x, offset_y = offset
     try:
-        with open(path, "r") as f:
-            for line in f:
-                x, y = map(int, line.strip().split())
-                new_x = x + offset_x
-                new_y = y + offset_y
-                if 0 <= new_x < grid.shape[1] and 0 <= new_y < grid.shape[0]:
-                    grid[new_y, new_x] = 1
+        # Any format of life/patterns.py; large RLE files are decoded chunk by chunk.
+        for xs, ys in iter_pattern(path):
+            xs, ys = xs + offset_x, ys + offset_y
+            inside = (xs >= 0) & (xs < grid.shape[1]) & (ys >= 0) & (ys < grid.shape[0])
+            grid[ys[inside], xs[inside]] = 1
         print(f"Pattern loaded from {path}")
     except Exception as e:
         print(f"Error loading pattern from {path}: {e}")
     return grid
 
+def save_checkpoint(grid, generation, filename=SNAPSHOTFILE, clock=None):
+    """Save the whole board, its generation and the rule as a binary snapshot (see life/snapshot.py)."""
+    path = get_pattern_file_path(filename)
+    save_snapshot(path, grid, RULE, generation, clock)
+    print(f"Snapshot saved to {path} (generation {generation})")
+
+def load_checkpoint(filename=SNAPSHOTFILE):
+    """Load a snapshot saved with save_checkpoint. Returns (grid, header), or (None, None) on error."""
+    path = get_pattern_file_path(filename)
+    try:
+        grid, header = load_snapshot(path)
+    except Exception as e:
+        print(f"Error loading snapshot from {path}: {e}")
+        return None, None
+    print(f"Snapshot loaded from {path} (generation {header['generation']})")
+    return grid, header
+
+def scrub(simulation, history, steps):
+    """Pause and move the board `steps` generations through the recorded history (negative = back)."""
+    simulation.paused = True
+    with simulation.edit() as grid:
+        target = simulation.generation + steps
+        if target in history:
+            frame = history.seek(target)
+            if frame.shape == grid.shape:
+                grid[...] = frame
+                simulation.generation = target
+
+def export_history(history, filename=HISTORYFILE):
+    """Save the recorded generations as an animation (GIF with Pillow, otherwise a .npy stack)."""
+    if not len(history):
+        print("History is empty")
+        return
+    path = get_pattern_file_path(filename)
+    try:
+        history.export(path)
+    except ImportError as e:
+        print(e)
+        path = os.path.splitext(path)[0] + ".npy"
+        history.export(path)
+    print(f"History ({len(history)} generations) exported to {path}")
+
 def main():
     clock = pygame.time.Clock()
-    grid = create_grid()
-    initial_grid = np.copy(grid)  # Store the initial state
+    advance = TiledStepper(RULE) if USE_TILED_ENGINE else update_grid
+    history = History(HISTORY_MEGABYTES << 20)
+    cycles = CycleDetector()
+
+    def on_step(grid, generation):
+        """Runs on the simulation thread after every generation; returning True pauses it."""
+        history.record(grid, generation)
+        # An empty board is not a cycle worth reporting (it is where drawing starts).
+        if cycles.cycle is not None or not grid.any():
+            return False
+        if cycles.observe(grid_digest(grid), generation) is None:
+            return False
+        first, period = cycles.cycle
+        print(f"Cycle detected: generation {generation} repeats generation {first} (period {period})")
+        return PAUSE_ON_CYCLE
+
+    # The simulation runs on its own thread; this loop only handles input and drawing.
+    simulation = SimulationWorker(create_grid(), advance, STEPS_PER_SECOND, on_step=on_step)
+    simulation.start()
+    initial_grid = np.copy(simulation.latest())  # Store the initial state
     running = True
-    paused = True
 
     offset_x, offset_y = 0, 0
     cell_size = CELL_SIZE
@@ -109,45 +155,61 @@ def main():
 
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    paused = not paused
-                    if not paused:
-                        initial_grid = np.copy(grid)  # Save current state as initial when starting
+                    if simulation.paused:
+                        initial_grid = np.copy(simulation.latest())  # Save current state as initial when starting
+                        # Record the board as it is now, edits included; anything after it is dropped.
+                        with simulation.edit() as grid:
+                            history.record(grid, simulation.generation)
+                            # Start cycle detection over from the resumed board.
+                            cycles.reset()
+                            cycles.observe(grid_digest(grid), simulation.generation)
+                    simulation.paused = not simulation.paused
                 if event.key == pygame.K_c:
-                    grid = create_grid()
+                    simulation.replace(create_grid())
                 if event.key == pygame.K_r:  # Reset to initial state
-                    grid = np.copy(initial_grid)
+                    simulation.replace(np.copy(initial_grid))
                 if event.key == pygame.K_e:  # Export pattern
-                    save_pattern(grid)
+                    save_pattern(simulation.latest())
                 if event.key == pygame.K_i:  # Import pattern
-                    grid = load_pattern(grid, offset=(0, 0))
+                    with simulation.edit() as grid:
+                        load_pattern(grid, offset=(0, 0))
+                if event.key == pygame.K_LEFT:  # Step back through the history
+                    scrub(simulation, history, -1)
+                if event.key == pygame.K_RIGHT:  # Step forward through the history
+                    scrub(simulation, history, 1)
+                if event.key == pygame.K_g:  # Export the history as an animation
+                    export_history(history)
+                if event.key == pygame.K_s:  # Save a binary snapshot
+                    save_checkpoint(simulation.latest(), simulation.generation)
+                if event.key == pygame.K_l:  # Resume from the snapshot
+                    grid, header = load_checkpoint()
+                    if grid is not None:
+                        simulation.replace(grid, header["generation"])
 
             if pygame.mouse.get_pressed()[0]:
                 pos = pygame.mouse.get_pos()
-                x = (pos[0] - offset_x) // cell_size
-                y = (pos[1] - offset_y) // cell_size
-                if 0 <= x < grid.shape[1] and 0 <= y < grid.shape[0]:
-                    grid[y, x] = 1
+                x = int((pos[0] - offset_x) // cell_size)
+                y = int((pos[1] - offset_y) // cell_size)
+                simulation.set_cell(y, x, 1)
 
             if pygame.mouse.get_pressed()[2]:  # Right-click to kill live cells
                 pos = pygame.mouse.get_pos()
-                x = (pos[0] - offset_x) // cell_size
-                y = (pos[1] - offset_y) // cell_size
-                if 0 <= x < grid.shape[1] and 0 <= y < grid.shape[0]:
-                    grid[y, x] = 0  
+                x = int((pos[0] - offset_x) // cell_size)
+                y = int((pos[1] - offset_y) // cell_size)
+                simulation.set_cell(y, x, 0)
 
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 4:  # Scroll up to zoom in
-                    cell_size = min(40, cell_size + 1)
-                if event.button == 5:  # Scroll down to zoom out
-                    cell_size = max(5, cell_size - 1)
-
-        if not paused:
-            grid = update_grid(grid)
+                    cell_size = min(40, cell_size + 1 if cell_size >= 1 else cell_size * 2)
+                if event.button == 5:  # Scroll down to zoom out (halving below one pixel per cell)
+                    cell_size = max(MIN_CELL_SIZE, cell_size - 1 if cell_size > 1 else cell_size / 2)
 
-        draw_grid(grid, offset_x, offset_y, cell_size)
+        # Draw whatever generation the simulation thread finished last.
+        draw_grid(simulation.latest(), offset_x, offset_y, cell_size)
         pygame.display.flip()
         clock.tick(FPS)
 
+    simulation.stop()
     pygame.quit()
 
 if __name__ == "__main__":
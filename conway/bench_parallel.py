@@ -0,0 +1,49 @@
+"""
+Benchmark: scaling of the parallel step across 1, 2, 4 and 8 workers.
+
+Usage: python bench_parallel.py [--size N] [--generations G] [--mode thread|process|both]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from life.engine import step
+from life.parallel import ParallelStepper
+
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=4096, help="board is size x size cells")
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--mode", choices=["thread", "process", "both"], default="both")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    grid = (rng.random((args.size, args.size)) < 0.3).astype(np.uint8)
+
+    start = time.perf_counter()
+    expected = grid
+    for _ in range(args.generations):
+        expected = step(expected)
+    serial = args.generations / (time.perf_counter() - start)
+    print(f"{args.size}x{args.size}, {args.generations} generations; serial: {serial:.2f} gen/s")
+
+    modes = ["thread", "process"] if args.mode == "both" else [args.mode]
+    print(f"{'mode':>8} {'workers':>8} {'gen/s':>10} {'speedup':>8}")
+    for mode in modes:
+        for workers in WORKER_COUNTS:
+            with ParallelStepper(workers, mode=mode) as stepper:
+                stepper.run(grid, 1)  # start the pool outside the measurement
+                start = time.perf_counter()
+                result = stepper.run(grid, args.generations)
+                rate = args.generations / (time.perf_counter() - start)
+            if not np.array_equal(result, expected):
+                raise AssertionError(f"{mode} mode with {workers} workers differs from the serial step")
+            print(f"{mode:>8} {workers:>8} {rate:>10.2f} {rate / serial:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: generations per second of the vectorized engine against the old per-cell loop,
+and of the tiled engine on mostly settled boards.
+
+Usage: python bench_step.py [--loop-max-cells N] [--seconds S]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from life.engine import step
+from life.tiles import TiledStepper
+
+# (rows, cols) — the first one is the 80x120 board used by base.py.
+GRID_SIZES = [(80, 120), (256, 256), (512, 512), (1024, 1024), (2048, 2048), (4096, 4096)]
+
+
+def loop_update_grid(grid):
+    """The original per-cell update_grid from base.py, kept as the reference implementation."""
+    new_grid = np.copy(grid)
+    for y in range(grid.shape[0]):
+        for x in range(grid.shape[1]):
+            neighbors = (
+                grid[(y - 1) % grid.shape[0], (x - 1) % grid.shape[1]]
+                + grid[(y - 1) % grid.shape[0], x % grid.shape[1]]
+                + grid[(y - 1) % grid.shape[0], (x + 1) % grid.shape[1]]
+                + grid[y % grid.shape[0], (x - 1) % grid.shape[1]]
+                + grid[y % grid.shape[0], (x + 1) % grid.shape[1]]
+                + grid[(y + 1) % grid.shape[0], (x - 1) % grid.shape[1]]
+                + grid[(y + 1) % grid.shape[0], x % grid.shape[1]]
+                + grid[(y + 1) % grid.shape[0], (x + 1) % grid.shape[1]]
+            )
+            if grid[y, x] == 1:
+                if neighbors < 2 or neighbors > 3:
+                    new_grid[y, x] = 0
+            elif grid[y, x] == 0 and neighbors == 3:
+                new_grid[y, x] = 1
+    return new_grid
+
+
+def random_grid(rows, cols, density=0.3, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.random((rows, cols)) < density).astype(int)
+
+
+def settled_grid(rows, cols):
+    """Blocks (still lifes) all over the board and a few blinkers in one corner tile."""
+    grid = np.zeros((rows, cols), dtype=np.uint8)
+    for dy in (0, 1):
+        for dx in (0, 1):
+            grid[2 + dy::8, 2 + dx::8] = 1
+    grid[:16, :16] = 0
+    grid[4, 2:5] = grid[10, 8:11] = 1
+    return grid
+
+
+def generations_per_second(update, grid, seconds):
+    """Step the grid repeatedly for about `seconds` and return the measured rate."""
+    generations = 0
+    start = time.perf_counter()
+    while True:
+        grid = update(grid)
+        generations += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return generations / elapsed
+
+
+def check_equivalence(generations=50):
+    """Both implementations must produce exactly the same generations."""
+    grid = random_grid(80, 120)
+    expected = grid
+    for _ in range(generations):
+        grid = step(grid)
+        expected = loop_update_grid(expected)
+        if not np.array_equal(grid, expected):
+            raise AssertionError("vectorized step diverged from the per-cell loop")
+    print(f"Engine matches the per-cell loop for {generations} generations.")
+    grid = random_grid(200, 300)
+    tiled = TiledStepper()
+    expected = grid
+    for _ in range(generations):
+        grid = tiled(grid)
+        expected = step(expected)
+        if not np.array_equal(grid, expected):
+            raise AssertionError("tiled engine diverged from the vectorized step")
+    print(f"Tiled engine matches the vectorized step for {generations} generations.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--loop-max-cells", type=int, default=512 * 512,
+                        help="skip the per-cell loop above this many cells (it needs minutes per generation)")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per measurement")
+    args = parser.parse_args()
+
+    check_equivalence()
+    print(f"{'grid':>12} {'loop gen/s':>12} {'numpy gen/s':>12} {'speedup':>9}")
+    for rows, cols in GRID_SIZES:
+        grid = random_grid(rows, cols)
+        fast = generations_per_second(step, grid, args.seconds)
+        if rows * cols <= args.loop_max_cells:
+            slow = generations_per_second(loop_update_grid, grid, args.seconds)
+            print(f"{rows:>5}x{cols:<6} {slow:>12.2f} {fast:>12.2f} {fast / slow:>8.0f}x")
+        else:
+            print(f"{rows:>5}x{cols:<6} {'skipped':>12} {fast:>12.2f} {'-':>9}")
+
+    print("Mostly settled boards (blocks everywhere, blinkers in one tile)")
+    print(f"{'grid':>12} {'numpy gen/s':>12} {'tiled gen/s':>12} {'speedup':>9}")
+    for rows, cols in GRID_SIZES[2:]:
+        grid = settled_grid(rows, cols)
+        fast = generations_per_second(step, grid, args.seconds)
+        tiled = generations_per_second(TiledStepper(), grid, args.seconds)
+        print(f"{rows:>5}x{cols:<6} {fast:>12.2f} {tiled:>12.2f} {tiled / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
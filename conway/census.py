@@ -0,0 +1,202 @@
+"""
+Soup census: evolve many random soups under several rules and tabulate what they become.
+
+Example (from the repository root):
+    python -m conway.census --rules B3/S23 B2/S23 B2n3/S23 --soups 2000 --generations 2000
+
+Every soup is a random --soup-size square in the middle of an empty board with
+dead edges. Soups are evolved in batches of --batch boards stepped together as
+one (batch, rows, cols) array, and the batches are spread over a process pool.
+Every rule sees the same soups, so the rules can be compared soup by soup. For
+each soup the output file (.npz, one array per column) records the population
+curve, when it stabilized (first generation of the cycle it ends in) and with
+which period, and the census of objects on the final board.
+
+With --underpop, --overpop or --birth the soups follow the stochastic mode of
+life/stochastic.py, with one random stream per batch; "stabilized" then only
+means that a board repeated an earlier one.
+"""
+import argparse
+import hashlib
+import multiprocessing as mp
+import os
+import time
+from collections import Counter
+from functools import partial
+
+import numpy as np
+
+from .life.engine import step
+from .life.objects import census
+from .life.rules import parse_rule
+from .life.stochastic import StochasticStepper
+
+DEFAULT_RULES = ["B3/S23", "B2/S23", "B2n3/S23"]
+
+
+def make_soups(rng, batch, shape, soup_size, density):
+    """A (batch, rows, cols) stack of empty boards with a random square soup in the middle of each."""
+    rows, cols = shape
+    boards = np.zeros((batch, rows, cols), dtype=np.uint8)
+    top, left = (rows - soup_size) // 2, (cols - soup_size) // 2
+    boards[:, top:top + soup_size, left:left + soup_size] = rng.random((batch, soup_size, soup_size)) < density
+    return boards
+
+
+def board_digests(boards):
+    """One 16-byte digest per board of the stack."""
+    packed = np.packbits(boards.reshape(len(boards), -1) != 0, axis=1)
+    return [hashlib.blake2b(row.tobytes(), digest_size=16).digest() for row in packed]
+
+
+def run_batch(task):
+    """
+    Evolve one batch of soups. `task` is (rule, seed, batch, shape, soup_size, density,
+    generations, probabilities) where probabilities is (underpop, overpop, birth) for
+    the stochastic mode of life/stochastic.py, or None for the deterministic rule.
+
+    Returns a dict of per-soup columns plus the final object census of every soup.
+    """
+    rule_text, seed, batch, shape, soup_size, density, generations, probabilities = task
+    rule = parse_rule(rule_text)
+    soup_seed, step_seed = seed.spawn(2)
+    boards = make_soups(np.random.default_rng(soup_seed), batch, shape, soup_size, density)
+    if probabilities:
+        advance = StochasticStepper(rule, *probabilities, seed=step_seed, wrap=False)
+    else:
+        advance = partial(step, rule=rule, wrap=False)
+
+    populations = np.zeros((batch, generations + 1), dtype=np.int32)
+    populations[:, 0] = np.count_nonzero(boards, axis=(1, 2))
+    seen = [{} for _ in range(batch)]
+    stabilized = np.full(batch, -1, dtype=np.int32)
+    period = np.zeros(batch, dtype=np.int32)
+    generation = 0
+    while True:
+        digests = board_digests(boards)
+        for index in np.flatnonzero(period == 0):
+            first = seen[index].setdefault(digests[index], generation)
+            if first != generation:
+                stabilized[index], period[index] = first, generation - first
+        # A repeated board only proves a cycle when the rule is deterministic.
+        if generation == generations or period.all() and not probabilities:
+            break
+        boards = advance(boards)
+        generation += 1
+        populations[:, generation] = np.count_nonzero(boards, axis=(1, 2))
+
+    if generation < generations:
+        # Every soup is in a cycle: the rest of each curve repeats with its period.
+        later = np.arange(generation + 1, generations + 1)
+        source = stabilized[:, None] + (later - stabilized[:, None]) % period[:, None]
+        populations[:, generation + 1:] = np.take_along_axis(populations, source, axis=1)
+
+    return {
+        "rule": rule_text,
+        "populations": populations,
+        "stabilized": stabilized,
+        "period": period,
+        "census": [census(board) for board in boards],
+    }
+
+
+def run_census(rules, soups, batch, shape, soup_size, density, generations, seed, workers=None,
+               probabilities=None):
+    """Run every rule on the same soups. Returns the list of batch results in task order."""
+    batches = -(-soups // batch)
+    # One child seed per batch, shared by all the rules: results do not depend on the worker count.
+    seeds = np.random.SeedSequence(seed).spawn(batches)
+    tasks = [
+        (rule, seeds[index], min(batch, soups - index * batch), shape, soup_size, density, generations,
+         probabilities)
+        for rule in rules
+        for index in range(batches)
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [run_batch(task) for task in tasks]
+    with mp.get_context().Pool(workers) as pool:
+        return pool.map(run_batch, tasks)
+
+
+def to_columns(results):
+    """Flatten batch results into equal-length columns (one row per soup, or per soup and object)."""
+    census_soup, census_object, census_count = [], [], []
+    soup = 0
+    for result in results:
+        for counts in result["census"]:
+            for name, count in sorted(counts.items()):
+                census_soup.append(soup)
+                census_object.append(name)
+                census_count.append(count)
+            soup += 1
+    populations = np.concatenate([result["populations"] for result in results])
+    return {
+        "rule": np.concatenate([np.full(len(result["period"]), result["rule"]) for result in results]),
+        "populations": populations,
+        "final_population": populations[:, -1],
+        "stabilized": np.concatenate([result["stabilized"] for result in results]),
+        "period": np.concatenate([result["period"] for result in results]),
+        "census_soup": np.array(census_soup, dtype=np.int64),
+        "census_object": np.array(census_object, dtype=str),
+        "census_count": np.array(census_count, dtype=np.int64),
+    }
+
+
+def summarize(columns):
+    """Print one block of statistics per rule."""
+    for rule in dict.fromkeys(columns["rule"].tolist()):
+        soups = np.flatnonzero(columns["rule"] == rule)
+        stabilized = columns["stabilized"][soups]
+        settled = stabilized >= 0
+        counts = Counter()
+        in_rule = np.isin(columns["census_soup"], soups)
+        for name, count in zip(columns["census_object"][in_rule], columns["census_count"][in_rule]):
+            counts[name] += int(count)
+        print(f"{rule}: {len(soups)} soups")
+        print(f"  stabilized:        {settled.mean():.1%}"
+              + (f", median at generation {np.median(stabilized[settled]):.0f}" if settled.any() else ""))
+        print(f"  final population:  mean {columns['final_population'][soups].mean():.1f}")
+        common = ", ".join(f"{name} {count}" for name, count in counts.most_common(6))
+        print(f"  objects:           {common or 'none'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rules", nargs="+", default=DEFAULT_RULES, help="rulestrings to compare")
+    parser.add_argument("--soups", type=int, default=1000, help="soups per rule")
+    parser.add_argument("--generations", type=int, default=1000, help="maximum generations per soup")
+    parser.add_argument("--width", type=int, default=64)
+    parser.add_argument("--height", type=int, default=64)
+    parser.add_argument("--soup-size", type=int, default=16, help="side of the random square")
+    parser.add_argument("--density", type=float, default=0.5, help="fraction of live cells in the soup")
+    parser.add_argument("--batch", type=int, default=64, help="boards stepped together as one array")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--underpop", type=float, default=0.0,
+                        help="probability that a cell dying of underpopulation survives (stochastic mode)")
+    parser.add_argument("--overpop", type=float, default=0.0,
+                        help="probability that a cell dying of overpopulation survives (stochastic mode)")
+    parser.add_argument("--birth", type=float, default=1.0, help="probability that a birth happens (stochastic mode)")
+    parser.add_argument("--output", default="census.npz")
+    args = parser.parse_args(argv)
+    if not 1 <= args.soup_size <= min(args.height, args.width):
+        parser.error(f"--soup-size must be between 1 and the board size ({args.width}x{args.height})")
+
+    rules = [str(parse_rule(rule)) for rule in args.rules]
+    probabilities = (args.underpop, args.overpop, args.birth)
+    if probabilities == (0.0, 0.0, 1.0):
+        probabilities = None
+    start = time.perf_counter()
+    results = run_census(rules, args.soups, args.batch, (args.height, args.width), args.soup_size,
+                         args.density, args.generations, args.seed, args.workers, probabilities)
+    elapsed = time.perf_counter() - start
+    columns = to_columns(results)
+    np.savez_compressed(args.output, **columns)
+
+    summarize(columns)
+    print(f"{len(columns['rule'])} soups in {elapsed:.1f} s; results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
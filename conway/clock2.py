@@ -1,7 +1,19 @@
 import os
+from functools import lru_cache
+
 import pygame
 import numpy as np
 
+from life.cycles import CycleDetector, grid_digest
+from life.engine import step
+from life.history import History
+from life.patterns import iter_pattern, write_pattern
+from life.render import GridRenderer
+from life.rules import parse_rule
+from life.snapshot import load_snapshot, save_snapshot
+from life.tiles import TiledStepper
+from life.worker import SimulationWorker
+
 # Initialize Pygame
 pygame.init()
 
@@ -11,8 +23,16 @@ CELL_SIZE = 10
 GRID_WIDTH = WIDTH // CELL_SIZE  # Fixed number of columns
 GRID_HEIGHT = HEIGHT // CELL_SIZE  # Fixed number of rows
 FPS = 120
-simulation_steps_per_frame = 1  # Number of simulation updates per rendered frame
+# Target generations per rendered frame. The simulation thread turns this into a rate of
+# simulation_steps_per_frame * FPS generations per second and holds it even when drawing is slow.
+simulation_steps_per_frame = 1
 CHARGEFILE = "pattern.txt"
+SNAPSHOTFILE = "board.snap"  # Binary checkpoint written with S and read back with L
+HISTORYFILE = "history.gif"  # Animation of the recorded history written with G
+HISTORY_MEGABYTES = 64  # Memory kept for rewinding with the arrow keys
+PAUSE_ON_CYCLE = False  # Pause once the board repeats an earlier generation (still life, oscillator)
+RULE = parse_rule("B3/S23")
+USE_TILED_ENGINE = False  # Only recompute the 64x64 tiles that changed (large, mostly settled boards)
 
 # Colors
 BLACK = (0, 0, 0)
@@ -121,9 +141,13 @@ DIGIT_PATTERNS_BIG = {
     ]
 }
 
+# The same patterns as boolean masks, built once.
+DIGIT_MASKS = {char: np.array(pattern, dtype=bool) for char, pattern in DIGIT_PATTERNS_BIG.items()}
+
 # ----- Global Screen Setup -----
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Conway's Game of Life with Live Cell Clock")
+renderer = GridRenderer(WHITE, BLACK)
 
 # ----- Utility Functions -----
 def get_pattern_file_path(filename="pattern.txt"):
@@ -135,121 +159,176 @@ def create_grid():
 
 def draw_grid(grid, offset_x, offset_y, cell_size):
     screen.fill(BLACK)
-    for y in range(grid.shape[0]):
-        for x in range(grid.shape[1]):
-            if grid[y, x] == 1:
-                pygame.draw.rect(
-                    screen, WHITE,
-                    ((x * cell_size) + offset_x, (y * cell_size) + offset_y, cell_size, cell_size)
-                )
+    renderer.draw(screen, grid, offset_x, offset_y, cell_size)
 
 def update_grid(grid):
-    new_grid = np.copy(grid)
-    for y in range(grid.shape[0]):
-        for x in range(grid.shape[1]):
-            neighbors = (
-                grid[(y - 1) % grid.shape[0], (x - 1) % grid.shape[1]]
-                + grid[(y - 1) % grid.shape[0], x % grid.shape[1]]
-                + grid[(y - 1) % grid.shape[0], (x + 1) % grid.shape[1]]
-                + grid[y % grid.shape[0], (x - 1) % grid.shape[1]]
-                + grid[y % grid.shape[0], (x + 1) % grid.shape[1]]
-                + grid[(y + 1) % grid.shape[0], (x - 1) % grid.shape[1]]
-                + grid[(y + 1) % grid.shape[0], x % grid.shape[1]]
-                + grid[(y + 1) % grid.shape[0], (x + 1) % grid.shape[1]]
-            )
-            if grid[y, x] == 1:
-                if neighbors < 2 or neighbors > 3:
-                    new_grid[y, x] = 0
-            elif grid[y, x] == 0 and neighbors == 3:
-                new_grid[y, x] = 1
-    return new_grid
+    return step(grid, RULE)
 
 def save_pattern(grid, filename="pattern.txt"):
     path = get_pattern_file_path(filename)
-    with open(path, "w") as f:
-        for y in range(grid.shape[0]):
-            for x in range(grid.shape[1]):
-                if grid[y, x] == 1:
-                    f.write(f"{x} {y}\n")
+    ys, xs = np.nonzero(grid == 1)
+    # The extension picks the format: .rle (with the rule), .lif, .cells, or "x y" lines.
+    write_pattern(path, xs, ys, RULE)
     print(f"Pattern saved to {path}")
 
 def load_pattern(grid, filename=CHARGEFILE, offset=(0,0)):
     path = get_pattern_file_path(filename)
     offset_x, offset_y = offset
     try:
-        with open(path, "r") as f:
-            for line in f:
-                x, y = map(int, line.strip().split())
-                new_x = x + offset_x
-                new_y = y + offset_y
-                if 0 <= new_x < grid.shape[1] and 0 <= new_y < grid.shape[0]:
-                    grid[new_y, new_x] = 1
+        # Any format of life/patterns.py; large RLE files are decoded chunk by chunk.
+        for xs, ys in iter_pattern(path):
+            xs, ys = xs + offset_x, ys + offset_y
+            inside = (xs >= 0) & (xs < grid.shape[1]) & (ys >= 0) & (ys < grid.shape[0])
+            grid[ys[inside], xs[inside]] = 1
         print(f"Pattern loaded from {path} with offset {offset}")
     except Exception as e:
         print(f"Error loading pattern from {path}: {e}")
     return grid
 
+@lru_cache(maxsize=16)
+def clock_area_cells(clock_area, offset_x, offset_y, cell_size, shape):
+    """
+    Grid-index slice (rows, columns) of the cells whose on-screen square overlaps
+    clock_area (left, top, width, height), like pygame.Rect.colliderect.
+    Cached, so it is only recomputed when the zoom, the offset or the clock size change.
+    """
+    left, top, width, height = clock_area
+    x_lo = max(0, (left - offset_x) // cell_size)
+    x_hi = min(shape[1], max(0, (left + width - offset_x + cell_size - 1) // cell_size))
+    y_lo = max(0, (top - offset_y) // cell_size)
+    y_hi = min(shape[0], max(0, (top + height - offset_y + cell_size - 1) // cell_size))
+    return slice(y_lo, y_hi), slice(x_lo, x_hi)
+
+def clear_cells(grid, cells):
+    """Kill every live cell in grid[cells] and return how many there were."""
+    region = grid[cells]
+    cleared = int(np.count_nonzero(region))
+    if cleared:
+        region[...] = 0
+    return cleared
+
 # ----- Modified Clock Drawing Function with Wave Effect -----
+def clock_string(clock_time):
+    """Convert clock_time (seconds) to an HH:MM:SS string."""
+    return f"{clock_time // 3600:02}:{(clock_time % 3600) // 60:02}:{clock_time % 60:02}"
+
+@lru_cache(maxsize=4)
+def clock_bitmap(time_str):
+    """
+    The clock as one boolean array (7 rows x total columns, one empty column between
+    characters) plus a mask of the columns that belong to a character rather than a gap.
+    """
+    bitmaps, glyph_columns = [], []
+    for char in time_str:
+        mask = DIGIT_MASKS.get(char)
+        if mask is None:
+            continue
+        bitmaps += [mask, np.zeros((mask.shape[0], 1), dtype=bool)]
+        glyph_columns += [np.ones(mask.shape[1], dtype=bool), np.zeros(1, dtype=bool)]
+    # Drop the gap after the last character.
+    return np.hstack(bitmaps[:-1]), np.concatenate(glyph_columns[:-1])
+
+def clock_columns(time_str):
+    """Total columns used by the clock."""
+    return clock_bitmap(time_str)[0].shape[1]
+
+@lru_cache(maxsize=64)
+def clock_surface(time_str, inverted_columns, cell_size):
+    """
+    Render the clock with its first `inverted_columns` columns inverted by the wave.
+    Gap columns are never inverted. Unlit cells are transparent (colour key).
+    """
+    bitmap, glyph_columns = clock_bitmap(time_str)
+    wave = glyph_columns & (np.arange(bitmap.shape[1]) < inverted_columns)
+    lit = bitmap ^ wave
+    surface = pygame.surfarray.make_surface(lit.T.astype(np.uint8) * 255)
+    surface = pygame.transform.scale(surface, (lit.shape[1] * cell_size, lit.shape[0] * cell_size))
+    surface.set_colorkey(BLACK)
+    return surface
+
 def draw_clock_live(clock_time, top_left, cell_size, wave_timer, wave_duration):
     """
     Draws a larger clock (using DIGIT_PATTERNS_BIG) and, if a wave is active,
     inverts cell states from left to right as the wave front passes.
     """
-    # Convert clock_time (seconds) to HH:MM:SS string.
-    hours = clock_time // 3600
-    minutes = (clock_time % 3600) // 60
-    seconds = clock_time % 60
-    time_str = f"{hours:02}:{minutes:02}:{seconds:02}"
-    
-    # Compute total columns used by the clock.
-    total_cols = 0
-    for char in time_str:
-        pattern = DIGIT_PATTERNS_BIG.get(char)
-        if pattern:
-            total_cols += len(pattern[0]) + 1  # pattern width + gap
-    total_cols -= 1  # remove gap after last character
-    
-    # Calculate clock dimensions.
-    clock_display_width = total_cols * cell_size
-    clock_display_height = 7 * cell_size  # 7 rows in our pattern
-
-    # Determine wave progress.
-    wave_progress = 0
+    time_str = clock_string(clock_time)
+    total_cols = clock_columns(time_str)
+
+    # Determine wave progress: columns left of the wave front are inverted.
+    inverted_columns = 0
     if wave_timer > 0:
-        wave_progress = 1 - (wave_timer / wave_duration)
-    wave_front = total_cols * wave_progress
+        wave_front = total_cols * (1 - (wave_timer / wave_duration))
+        inverted_columns = min(total_cols, int(np.ceil(wave_front)))
 
-    # Draw each character.
-    x_offset_cells = 0  # in cell units relative to clock area top-left
-    for char in time_str:
-        pattern = DIGIT_PATTERNS_BIG.get(char)
-        if not pattern:
-            continue
-        rows = len(pattern)
-        cols = len(pattern[0])
-        for r in range(rows):
-            for c in range(cols):
-                global_x = x_offset_cells + c
-                cell_on = (pattern[r][c] == 1)
-                if wave_timer > 0 and global_x < wave_front:
-                    cell_on = not cell_on
-                if cell_on:
-                    cell_rect = pygame.Rect(
-                        top_left[0] + (x_offset_cells + c) * cell_size,
-                        top_left[1] + r * cell_size,
-                        cell_size,
-                        cell_size
-                    )
-                    pygame.draw.rect(screen, WHITE, cell_rect)
-        x_offset_cells += cols + 1
+    # The surface is only rebuilt when the time, the wave front or the zoom change.
+    screen.blit(clock_surface(time_str, inverted_columns, cell_size), top_left)
 
 # ----- Main Game Loop -----
+def save_checkpoint(grid, generation, filename=SNAPSHOTFILE, clock=None):
+    """Save the whole board, its generation and the rule as a binary snapshot (see life/snapshot.py)."""
+    path = get_pattern_file_path(filename)
+    save_snapshot(path, grid, RULE, generation, clock)
+    print(f"Snapshot saved to {path} (generation {generation})")
+
+def load_checkpoint(filename=SNAPSHOTFILE):
+    """Load a snapshot saved with save_checkpoint. Returns (grid, header), or (None, None) on error."""
+    path = get_pattern_file_path(filename)
+    try:
+        grid, header = load_snapshot(path)
+    except Exception as e:
+        print(f"Error loading snapshot from {path}: {e}")
+        return None, None
+    print(f"Snapshot loaded from {path} (generation {header['generation']})")
+    return grid, header
+
+def scrub(simulation, history, steps):
+    """Pause and move the board `steps` generations through the recorded history (negative = back)."""
+    simulation.paused = True
+    with simulation.edit() as grid:
+        target = simulation.generation + steps
+        if target in history:
+            frame = history.seek(target)
+            if frame.shape == grid.shape:
+                grid[...] = frame
+                simulation.generation = target
+
+def export_history(history, filename=HISTORYFILE):
+    """Save the recorded generations as an animation (GIF with Pillow, otherwise a .npy stack)."""
+    if not len(history):
+        print("History is empty")
+        return
+    path = get_pattern_file_path(filename)
+    try:
+        history.export(path)
+    except ImportError as e:
+        print(e)
+        path = os.path.splitext(path)[0] + ".npy"
+        history.export(path)
+    print(f"History ({len(history)} generations) exported to {path}")
+
 def main():
     sim_clock = pygame.time.Clock()
-    grid = create_grid()
-    initial_grid = np.copy(grid)  # Store the initial state
+    advance = TiledStepper(RULE) if USE_TILED_ENGINE else update_grid
+    history = History(HISTORY_MEGABYTES << 20)
+    cycles = CycleDetector()
+
+    def on_step(grid, generation):
+        """Runs on the simulation thread after every generation; returning True pauses it."""
+        history.record(grid, generation)
+        # An empty board is not a cycle worth reporting (it is where drawing starts).
+        if cycles.cycle is not None or not grid.any():
+            return False
+        if cycles.observe(grid_digest(grid), generation) is None:
+            return False
+        first, period = cycles.cycle
+        print(f"Cycle detected: generation {generation} repeats generation {first} (period {period})")
+        return PAUSE_ON_CYCLE
+
+    # The simulation runs on its own thread; this loop handles input, the clock and drawing.
+    simulation = SimulationWorker(create_grid(), advance, simulation_steps_per_frame * FPS, on_step=on_step)
+    simulation.start()
+    initial_grid = np.copy(simulation.latest())  # Store the initial state
     running = True
-    paused = True
 
     offset_x, offset_y = 0, 0
     cell_size = CELL_SIZE
@@ -275,17 +354,41 @@ def main():
             # Keyboard controls.
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    paused = not paused
-                    if not paused:
-                        initial_grid = np.copy(grid)
+                    if simulation.paused:
+                        initial_grid = np.copy(simulation.latest())
+                        # Record the board as it is now, edits included; anything after it is dropped.
+                        with simulation.edit() as grid:
+                            history.record(grid, simulation.generation)
+                            # Start cycle detection over from the resumed board.
+                            cycles.reset()
+                            cycles.observe(grid_digest(grid), simulation.generation)
+                    simulation.paused = not simulation.paused
                 if event.key == pygame.K_c:
-                    grid = create_grid()
+                    simulation.replace(create_grid())
                 if event.key == pygame.K_r:
-                    grid = np.copy(initial_grid)
+                    simulation.replace(np.copy(initial_grid))
                 if event.key == pygame.K_e:
-                    save_pattern(grid)
+                    save_pattern(simulation.latest())
                 if event.key == pygame.K_i:
-                    grid = load_pattern(grid, offset=(10, 0))
+                    with simulation.edit() as grid:
+                        load_pattern(grid, offset=(10, 0))
+                if event.key == pygame.K_LEFT:  # Step back through the history
+                    scrub(simulation, history, -1)
+                if event.key == pygame.K_RIGHT:  # Step forward through the history
+                    scrub(simulation, history, 1)
+                if event.key == pygame.K_g:  # Export the history as an animation
+                    export_history(history)
+                if event.key == pygame.K_s:  # Save a binary snapshot, clock included
+                    clock_state = {"clock_time": clock_time, "wave_timer": wave_timer, "wave_pending": wave_pending}
+                    save_checkpoint(simulation.latest(), simulation.generation, clock=clock_state)
+                if event.key == pygame.K_l:  # Resume from the snapshot
+                    grid, header = load_checkpoint()
+                    if grid is not None:
+                        simulation.replace(grid, header["generation"])
+                        clock_state = header["clock"] or {}
+                        clock_time = clock_state.get("clock_time", clock_time)
+                        wave_timer = clock_state.get("wave_timer", 0)
+                        wave_pending = clock_state.get("wave_pending", False)
 
             # Mouse button down.
             if event.type == pygame.MOUSEBUTTONDOWN:
@@ -315,30 +418,17 @@ def main():
                 pos = pygame.mouse.get_pos()
                 x = (pos[0] - offset_x) // cell_size
                 y = (pos[1] - offset_y) // cell_size
-                if 0 <= x < grid.shape[1] and 0 <= y < grid.shape[0]:
-                    grid[y, x] = 1
+                simulation.set_cell(y, x, 1)
 
             # Right-click to kill a cell.
             if pygame.mouse.get_pressed()[2]:
                 pos = pygame.mouse.get_pos()
                 x = (pos[0] - offset_x) // cell_size
                 y = (pos[1] - offset_y) // cell_size
-                if 0 <= x < grid.shape[1] and 0 <= y < grid.shape[0]:
-                    grid[y, x] = 0
-
-        # Update the simulation.
-        if not paused:
-            for _ in range(simulation_steps_per_frame):
-                grid = update_grid(grid)
+                simulation.set_cell(y, x, 0)
 
         # Calculate clock area dimensions based on the BIG pattern.
-        sample_time_str = f"{(clock_time // 3600):02}:{(clock_time % 3600)//60:02}:{(clock_time % 60):02}"
-        total_cols = 0
-        for char in sample_time_str:
-            pattern = DIGIT_PATTERNS_BIG.get(char)
-            if pattern:
-                total_cols += len(pattern[0]) + 1
-        total_cols -= 1  # remove last gap
+        total_cols = clock_columns(clock_string(clock_time))
         clock_display_width = total_cols * cell_size
         clock_display_height = 7 * cell_size  # pattern height
 
@@ -346,15 +436,15 @@ def main():
         clock_top_left = (WIDTH - clock_display_width - 10, HEIGHT - clock_display_height - 10)
         clock_area_rect = pygame.Rect(clock_top_left[0], clock_top_left[1], clock_display_width, clock_display_height)
 
-        # Delete any simulation cells that intrude into the clock area.
-        collision = False
-        for y in range(grid.shape[0]):
-            for x in range(grid.shape[1]):
-                if grid[y, x] == 1:
-                    cell_rect = pygame.Rect(x * cell_size + offset_x, y * cell_size + offset_y, cell_size, cell_size)
-                    if cell_rect.colliderect(clock_area_rect):
-                        grid[y, x] = 0
-                        collision = True
+        # Delete any simulation cells that intrude into the clock area (the board is only
+        # locked when there are some, so the simulation is not interrupted every frame).
+        board = simulation.latest()
+        clock_cells = clock_area_cells(tuple(clock_area_rect), offset_x, offset_y, cell_size, board.shape)
+        cleared_cells = 0
+        if np.any(board[clock_cells]):
+            with simulation.edit() as grid:
+                cleared_cells = clear_cells(grid, clock_cells)
+        collision = cleared_cells > 0
 
         # When a new collision is detected, start the wave effect but do not update the clock yet.
         if collision and not collision_flag and not wave_pending:
@@ -374,13 +464,14 @@ def main():
                 clock_time = 0
             wave_pending = False
 
-        # Draw grid and overlay the live-cell clock.
-        draw_grid(grid, offset_x, offset_y, cell_size)
+        # Draw the latest finished generation and overlay the live-cell clock.
+        draw_grid(simulation.latest(), offset_x, offset_y, cell_size)
         draw_clock_live(clock_time, clock_top_left, cell_size, wave_timer, wave_duration)
 
         pygame.display.flip()
         sim_clock.tick(FPS)
 
+    simulation.stop()
     pygame.quit()
 
 if __name__ == "__main__":
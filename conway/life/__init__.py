@@ -0,0 +1,3 @@
+"""Shared Game of Life engines used by the pygame front-ends in this folder."""
+from .engine import count_neighbors, step
+from .rules import LIFE, Rule, parse_rule
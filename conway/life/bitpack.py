@@ -0,0 +1,130 @@
+"""
+Bit-packed grids: 64 cells per uint64 word, stepped with bitwise adder logic.
+
+Column x of a row lives in word x // 64, bit x % 64. Unused bits at the end of
+the last word of every row are kept at zero. pack_grid and unpack_grid convert
+from and to the dense arrays used by draw_grid, save_pattern and load_pattern.
+"""
+import numpy as np
+
+from .rules import LIFE
+
+WORD_BITS = 64
+_WORD = np.dtype("<u8")
+
+
+def words_per_row(width):
+    return -(-width // WORD_BITS)
+
+
+def pack_grid(grid):
+    """Pack a dense (rows, cols) grid into a (rows, words) uint64 array."""
+    rows, cols = grid.shape
+    bits = np.zeros((rows, words_per_row(cols) * WORD_BITS), dtype=np.uint8)
+    bits[:, :cols] = np.asarray(grid) != 0
+    return np.packbits(bits, axis=1, bitorder="little").view(_WORD)
+
+
+def unpack_grid(packed, width, dtype=int):
+    """Expand a packed grid back into a dense (rows, width) array of 0/1 values."""
+    as_bytes = np.ascontiguousarray(packed, dtype=_WORD).view(np.uint8)
+    bits = np.unpackbits(as_bytes, axis=1, count=width, bitorder="little")
+    return bits.astype(dtype, copy=False)
+
+
+def population(packed):
+    """Number of live cells, counted without unpacking the grid."""
+    as_bytes = np.ascontiguousarray(packed, dtype=_WORD).view(np.uint8)
+    return int(np.unpackbits(as_bytes).sum(dtype=np.int64))
+
+
+def _last_word_mask(width):
+    used = width % WORD_BITS
+    return np.uint64((1 << used) - 1) if used else np.uint64(~np.uint64(0))
+
+
+def _horizontal(packed, width, wrap):
+    """Return (west, east): every cell sees its left and right neighbor at its own bit position."""
+    zeros = np.zeros_like(packed[:, :1])
+    if wrap:
+        previous_words = np.roll(packed, 1, axis=1)
+        next_words = np.roll(packed, -1, axis=1)
+    else:
+        previous_words = np.concatenate([zeros, packed[:, :-1]], axis=1)
+        next_words = np.concatenate([packed[:, 1:], zeros], axis=1)
+    west = (packed << np.uint64(1)) | (previous_words >> np.uint64(WORD_BITS - 1))
+    east = (packed >> np.uint64(1)) | (next_words << np.uint64(WORD_BITS - 1))
+
+    used = width % WORD_BITS
+    if wrap and used:
+        # The last word is only partly used, so the torus seam does not fall on a word boundary.
+        last_column = (packed[:, -1] >> np.uint64(used - 1)) & np.uint64(1)
+        first_column = packed[:, 0] & np.uint64(1)
+        west[:, 0] |= last_column
+        east[:, -1] |= first_column << np.uint64(used - 1)
+    west[:, -1] &= _last_word_mask(width)
+    east[:, -1] &= _last_word_mask(width)
+    return west, east
+
+
+def _vertical(plane, wrap):
+    """Return (up, down): every cell sees the row above and below."""
+    if wrap:
+        return np.roll(plane, 1, axis=0), np.roll(plane, -1, axis=0)
+    zeros = np.zeros_like(plane[:1])
+    return np.concatenate([zeros, plane[:-1]]), np.concatenate([plane[1:], zeros])
+
+
+def _full_add(a, b, c):
+    """Add three bit planes: returns (sum, carry)."""
+    partial = a ^ b
+    return partial ^ c, (a & b) | (partial & c)
+
+
+def count_bits(packed, width, wrap=True):
+    """
+    Count the eight neighbors of 64 cells per word at once.
+
+    Returns the four bit planes (ones, twos, fours, eights) of the neighbor count.
+    """
+    west, east = _horizontal(packed, width, wrap)
+    # Two-bit sums of each row triple, and of the left/right pair of the middle row.
+    row_ones, row_twos = _full_add(west, packed, east)
+    mid_ones, mid_twos = west ^ east, west & east
+
+    up_ones, down_ones = _vertical(row_ones, wrap)
+    up_twos, down_twos = _vertical(row_twos, wrap)
+
+    ones, carry = _full_add(up_ones, mid_ones, down_ones)
+    twos_sum, fours_a = _full_add(up_twos, mid_twos, down_twos)
+    twos = twos_sum ^ carry
+    fours_b = twos_sum & carry
+    return ones, twos, fours_a ^ fours_b, fours_a & fours_b
+
+
+def _count_equals(bits, count):
+    """Bit plane of the cells whose neighbor count equals `count`."""
+    mask = np.full_like(bits[0], ~np.uint64(0))
+    for position, plane in enumerate(bits):
+        mask &= plane if (count >> position) & 1 else ~plane
+    return mask
+
+
+def step_packed(packed, width, rule=LIFE, wrap=True):
+    """Advance a packed grid one generation with `rule`."""
+    bits = count_bits(packed, width, wrap)
+    born = np.zeros_like(packed)
+    survive = np.zeros_like(packed)
+    for count in rule.birth:
+        born |= _count_equals(bits, count)
+    for count in rule.survival:
+        survive |= _count_equals(bits, count)
+    if rule.birth_2n:
+        west, east = _horizontal(packed, width, wrap)
+        north_west, south_west = _vertical(west, wrap)
+        north_east, south_east = _vertical(east, wrap)
+        opposite_corners = (north_west & south_east) | (north_east & south_west)
+        born |= _count_equals(bits, 2) & opposite_corners
+    new_packed = (packed & survive) | (~packed & born)
+    new_packed[:, -1] &= _last_word_mask(width)
+    return new_packed
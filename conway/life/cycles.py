@@ -0,0 +1,88 @@
+"""
+Cycle detection: notice when a board repeats an earlier generation.
+
+Every generation is reduced to a 16-byte BLAKE2b digest of its bit-packed
+cells and kept in a digest -> generation index. A digest seen again at
+generation g after generation f means the board has entered a cycle of period
+g - f (1 for still lifes and dead boards), and every later generation can be
+predicted without stepping.
+"""
+import hashlib
+from collections import deque
+
+import numpy as np
+
+from .bitpack import pack_grid, step_packed
+from .rules import LIFE
+
+DIGEST_SIZE = 16
+
+
+def packed_digest(packed, width):
+    """Digest of a bit-packed board (see life/bitpack.py) of `width` columns."""
+    digest = hashlib.blake2b(np.ascontiguousarray(packed).tobytes(), digest_size=DIGEST_SIZE)
+    digest.update(np.array([packed.shape[0], width], dtype="<u8").tobytes())
+    return digest.digest()
+
+
+def grid_digest(grid):
+    """Digest of a dense 0/1 grid; equal for equal boards whatever their dtype."""
+    return packed_digest(pack_grid(grid), grid.shape[1])
+
+
+def cells_digest(xs, ys):
+    """Digest of a set of live cell coordinates (for the unbounded engines)."""
+    keys = np.unique(np.column_stack((np.asarray(ys, dtype=np.int64), np.asarray(xs, dtype=np.int64))), axis=0)
+    return hashlib.blake2b(keys.astype("<i8").tobytes(), digest_size=DIGEST_SIZE).digest()
+
+
+class CycleDetector:
+    """
+    Remember the digests of the last `window` generations and report repeats.
+
+    Periods longer than the window are not detected; memory stays at about
+    `window` digests whatever the board size.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._generations = {}
+        self._order = deque()
+        self.cycle = None  # (first generation of the cycle, period) once found
+
+    def observe(self, digest, generation):
+        """Record the digest of `generation`. Returns the period if it repeats an earlier one, else None."""
+        if self._order and generation <= self._order[-1][1]:
+            self.reset()  # the board was rewound: start over
+        seen = self._generations.get(digest)
+        if seen is not None:
+            self.cycle = (seen, generation - seen)
+            return generation - seen
+        self._generations[digest] = generation
+        self._order.append((digest, generation))
+        while self._order and self._order[0][1] <= generation - self.window:
+            old_digest, old_generation = self._order.popleft()
+            if self._generations.get(old_digest) == old_generation:
+                del self._generations[old_digest]
+        return None
+
+
+def find_cycle(grid, rule=LIFE, max_generations=1000, wrap=True):
+    """
+    Step a dense grid until it repeats itself or `max_generations` pass.
+
+    Returns (first generation of the cycle, period), or None if no repeat was
+    found. Works on the bit-packed board, so classifying many patterns is cheap.
+    """
+    width = grid.shape[1]
+    packed = pack_grid(grid)
+    detector = CycleDetector(window=max_generations + 1)
+    detector.observe(packed_digest(packed, width), 0)
+    for generation in range(1, max_generations + 1):
+        packed = step_packed(packed, width, rule, wrap)
+        if detector.observe(packed_digest(packed, width), generation) is not None:
+            return detector.cycle
+    return None
@@ -0,0 +1,307 @@
+"""
+HashLife: jump a pattern forward 2**k generations at a time.
+
+The plane is stored as a quadtree whose nodes are canonical (two equal
+squares are the same object), so the result of advancing a node can be
+memoized and reused wherever that square appears, at any time and place.
+The node table is garbage collected when it grows past `max_nodes`.
+"""
+import numpy as np
+
+from .patterns import read_pattern
+from .rules import LIFE, parse_rule
+
+
+class Node:
+    """A 2**level square of cells made of four canonical quadrants."""
+
+    __slots__ = ("level", "nw", "ne", "sw", "se", "population")
+
+    def __init__(self, level, nw, ne, sw, se, population):
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+# The two single cells, shared by every universe.
+DEAD = Node(0, None, None, None, None, 0)
+ALIVE = Node(0, None, None, None, None, 1)
+
+
+class HashLife:
+    """
+    An unbounded Life universe stepped with the HashLife algorithm.
+
+    The root node covers the square whose top-left cell is `origin`; it grows
+    as the pattern spreads and shrinks back when its border is empty.
+    """
+
+    def __init__(self, rule=LIFE, max_nodes=1_000_000):
+        self.rule = parse_rule(rule)
+        if 0 in self.rule.birth:
+            raise ValueError("HashLife cannot run rules with B0: empty space would have to change")
+        self.max_nodes = max_nodes
+        self.generation = 0
+        self._nodes = {}
+        self._empties = [DEAD]
+        self._successors = {}
+        self._boxes = {}
+        self.root = self._empty(3)
+        self.origin = (0, 0)
+
+    # ----- Construction -----
+    @classmethod
+    def from_cells(cls, xs, ys, rule=LIFE, max_nodes=1_000_000):
+        universe = cls(rule, max_nodes)
+        universe.set_cells(xs, ys)
+        return universe
+
+    @classmethod
+    def from_file(cls, path, rule=None, max_nodes=1_000_000):
+        """Load an "x y" pattern file or an RLE file; the RLE rule header is used unless `rule` is given."""
+        xs, ys, file_rule = read_pattern(path)
+        return cls.from_cells(xs, ys, rule or file_rule or LIFE, max_nodes)
+
+    def set_cells(self, xs, ys):
+        """Replace the universe with the given live cells."""
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        if len(xs) == 0:
+            self.root, self.origin = self._empty(3), (0, 0)
+            return
+        x0, y0 = int(xs.min()), int(ys.min())
+        extent = max(int(xs.max()) - x0, int(ys.max()) - y0) + 1
+        level = max(3, int(extent - 1).bit_length())
+        self.root = self._build(xs - x0, ys - y0, level)
+        self.origin = (x0, y0)
+
+    def _build(self, xs, ys, level):
+        if len(xs) == 0:
+            return self._empty(level)
+        if level == 0:
+            return ALIVE
+        half = 1 << (level - 1)
+        east = xs >= half
+        south = ys >= half
+        quadrants = []
+        for in_south in (False, True):
+            for in_east in (False, True):
+                mask = (east == in_east) & (south == in_south)
+                quadrants.append(self._build(xs[mask] - half * in_east, ys[mask] - half * in_south, level - 1))
+        return self._join(*quadrants)
+
+    def _join(self, nw, ne, sw, se):
+        key = (nw, ne, sw, se)
+        node = self._nodes.get(key)
+        if node is None:
+            population = nw.population + ne.population + sw.population + se.population
+            node = Node(nw.level + 1, nw, ne, sw, se, population)
+            self._nodes[key] = node
+        return node
+
+    def _empty(self, level):
+        while len(self._empties) <= level:
+            smaller = self._empties[-1]
+            self._empties.append(self._join(smaller, smaller, smaller, smaller))
+        return self._empties[level]
+
+    def _expand(self, node):
+        """The node centred in a square twice as wide."""
+        empty = self._empty(node.level - 1)
+        return self._join(
+            self._join(empty, empty, empty, node.nw),
+            self._join(empty, empty, node.ne, empty),
+            self._join(empty, node.sw, empty, empty),
+            self._join(node.se, empty, empty, empty),
+        )
+
+    def _center(self, node):
+        return self._join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    # ----- Evolution -----
+    def _life_4x4(self, node):
+        """One generation of the central 2x2 cells of a 4x4 node."""
+        nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+        cells = [
+            [nw.nw, nw.ne, ne.nw, ne.ne],
+            [nw.sw, nw.se, ne.sw, ne.se],
+            [sw.nw, sw.ne, se.nw, se.ne],
+            [sw.sw, sw.se, se.sw, se.se],
+        ]
+        bits = [[cell.population for cell in row] for row in cells]
+        table = self.rule.table
+        result = []
+        for y in (1, 2):
+            for x in (1, 2):
+                neighbors = sum(bits[y + dy][x + dx] for dy in (-1, 0, 1) for dx in (-1, 0, 1)) - bits[y][x]
+                state = int(table[bits[y][x], neighbors])
+                if self.rule.birth_2n and not bits[y][x] and neighbors == 2:
+                    corners = (bits[y - 1][x - 1] and bits[y + 1][x + 1]) or (bits[y - 1][x + 1] and bits[y + 1][x - 1])
+                    state = int(bool(corners))
+                result.append(ALIVE if state else DEAD)
+        return self._join(*result)
+
+    def _successor(self, node, j):
+        """The centre of `node` (one level smaller) advanced 2**j generations, with j <= level - 2."""
+        j = min(j, node.level - 2)
+        key = (node, j)
+        result = self._successors.get(key)
+        if result is not None:
+            return result
+
+        if node.population == 0:
+            result = self._empty(node.level - 1)
+        elif node.level == 2:
+            result = self._life_4x4(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            # Nine overlapping sub-squares, each one level below `node`.
+            n00 = nw
+            n01 = self._join(nw.ne, ne.nw, nw.se, ne.sw)
+            n02 = ne
+            n10 = self._join(nw.sw, nw.se, sw.nw, sw.ne)
+            n11 = self._join(nw.se, ne.sw, sw.ne, se.nw)
+            n12 = self._join(ne.sw, ne.se, se.nw, se.ne)
+            n20 = sw
+            n21 = self._join(sw.ne, se.nw, sw.se, se.sw)
+            n22 = se
+            parts = [self._successor(n, j) for n in (n00, n01, n02, n10, n11, n12, n20, n21, n22)]
+            quarters = (
+                (parts[0], parts[1], parts[3], parts[4]),
+                (parts[1], parts[2], parts[4], parts[5]),
+                (parts[3], parts[4], parts[6], parts[7]),
+                (parts[4], parts[5], parts[7], parts[8]),
+            )
+            if j < node.level - 2:
+                # The first half already covered all 2**j generations: just recentre.
+                result = self._join(*(self._join(a.se, b.sw, c.ne, d.nw) for a, b, c, d in quarters))
+            else:
+                result = self._join(*(self._successor(self._join(*q), j) for q in quarters))
+
+        self._successors[key] = result
+        return result
+
+    def _is_padded(self, node):
+        """True when every live cell sits in the central quarter of the node."""
+        if node.level < 3:
+            return False
+        inner = (node.nw.se.se.population + node.ne.sw.sw.population
+                 + node.sw.ne.ne.population + node.se.nw.nw.population)
+        return inner == node.population
+
+    def _advance(self, j):
+        """Move the whole universe forward 2**j generations."""
+        root, (x0, y0) = self.root, self.origin
+        while root.level < j + 2 or not self._is_padded(root):
+            shift = 1 << (root.level - 1)
+            root, x0, y0 = self._expand(root), x0 - shift, y0 - shift
+        shift = 1 << (root.level - 1)
+        root, x0, y0 = self._expand(root), x0 - shift, y0 - shift
+
+        shift = 1 << (root.level - 2)
+        root, x0, y0 = self._successor(root, j), x0 + shift, y0 + shift
+        # Drop empty borders so the next jump starts from the smallest square.
+        while root.level > 3 and self._center(root).population == root.population:
+            shift = 1 << (root.level - 2)
+            root, x0, y0 = self._center(root), x0 + shift, y0 + shift
+
+        self.root, self.origin = root, (x0, y0)
+        self.generation += 1 << j
+        if len(self._nodes) > self.max_nodes:
+            self.collect()
+
+    def step(self, generations=1):
+        """
+        Advance `generations` generations.
+
+        Powers of two (step(2**k)) take a single HashLife jump; any other count is
+        split into the powers of two of its binary representation.
+        """
+        if generations < 0:
+            raise ValueError("HashLife cannot step backwards")
+        j = 0
+        while generations:
+            if generations & 1:
+                self._advance(j)
+            generations >>= 1
+            j += 1
+        return self
+
+    # ----- Memory -----
+    def collect(self):
+        """
+        Garbage collect the node table, keeping only nodes reachable from the root.
+
+        The memoized successors are dropped as well, since they are what keeps
+        old nodes alive; they are rebuilt on demand.
+        """
+        self._successors.clear()
+        self._boxes.clear()
+        kept = {}
+        stack = [self.root] + self._empties[1:]
+        while stack:
+            node = stack.pop()
+            if node.level == 0:
+                continue
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key in kept:
+                continue
+            kept[key] = node
+            stack.extend(key)
+        self._nodes = kept
+
+    @property
+    def node_count(self):
+        return len(self._nodes)
+
+    # ----- Queries -----
+    @property
+    def population(self):
+        return self.root.population
+
+    def _box(self, node):
+        """Bounding box (x0, y0, x1, y1) of the live cells relative to the node, or None if empty."""
+        if node.population == 0:
+            return None
+        if node.level == 0:
+            return (0, 0, 0, 0)
+        box = self._boxes.get(node)
+        if box is None:
+            half = 1 << (node.level - 1)
+            boxes = []
+            for child, dx, dy in ((node.nw, 0, 0), (node.ne, half, 0), (node.sw, 0, half), (node.se, half, half)):
+                child_box = self._box(child)
+                if child_box is not None:
+                    boxes.append((child_box[0] + dx, child_box[1] + dy, child_box[2] + dx, child_box[3] + dy))
+            box = (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                   max(b[2] for b in boxes), max(b[3] for b in boxes))
+            self._boxes[node] = box
+        return box
+
+    def bounding_box(self):
+        """Inclusive (x_min, y_min, x_max, y_max) of the live cells, or None for an empty universe."""
+        box = self._box(self.root)
+        if box is None:
+            return None
+        x0, y0 = self.origin
+        return (box[0] + x0, box[1] + y0, box[2] + x0, box[3] + y0)
+
+    def cells(self):
+        """Coordinates (xs, ys) of every live cell, found by walking only the non-empty nodes."""
+        xs, ys = [], []
+        stack = [(self.root, self.origin[0], self.origin[1])]
+        while stack:
+            node, x, y = stack.pop()
+            if node.population == 0:
+                continue
+            if node.level == 0:
+                xs.append(x)
+                ys.append(y)
+                continue
+            half = 1 << (node.level - 1)
+            stack.extend(((node.nw, x, y), (node.ne, x + half, y),
+                          (node.sw, x, y + half), (node.se, x + half, y + half)))
+        return np.array(xs, dtype=np.int64), np.array(ys, dtype=np.int64)
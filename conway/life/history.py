@@ -0,0 +1,176 @@
+"""
+Bounded generation history for rewinding and scrubbing.
+
+Generations are stored in segments: a bit-packed keyframe followed by XOR
+deltas, one per generation, each holding the flat indices of the cells that
+changed since the previous generation. Seeking to a generation near the last
+one visited flips only the cells in the deltas in between, so stepping
+backwards or forwards costs O(changed cells) instead of a recomputation.
+When the history grows past its memory budget the oldest segments are dropped.
+"""
+import numpy as np
+
+
+class _Segment:
+    __slots__ = ("start", "shape", "keyframe", "deltas", "nbytes")
+
+    def __init__(self, start, cells):
+        self.start = start
+        self.shape = cells.shape
+        self.keyframe = np.packbits(cells)
+        self.deltas = []
+        self.nbytes = self.keyframe.nbytes
+
+    @property
+    def stop(self):
+        """Last generation stored in this segment."""
+        return self.start + len(self.deltas)
+
+    def unpack(self):
+        size = int(np.prod(self.shape))
+        return np.unpackbits(self.keyframe, count=size).astype(bool).reshape(self.shape)
+
+
+class History:
+    """
+    Remember the last generations of a board within `max_bytes` of memory.
+
+    Call record(grid, generation) after every generation; recording a
+    generation that is not newer than the last one first drops everything after
+    it (the timeline was rewound and is now being rewritten).
+    """
+
+    def __init__(self, max_bytes=64 << 20, keyframe_every=100):
+        self.max_bytes = max_bytes
+        self.keyframe_every = keyframe_every
+        self.clear()
+
+    def clear(self):
+        self._segments = []
+        self._nbytes = 0
+        self._last = None
+        self._cursor = None  # (segment, generation, cells) of the last seek
+
+    # ----- Size -----
+    @property
+    def oldest(self):
+        return self._segments[0].start if self._segments else None
+
+    @property
+    def newest(self):
+        return self._segments[-1].stop if self._segments else None
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def __len__(self):
+        return self.newest - self.oldest + 1 if self._segments else 0
+
+    def __contains__(self, generation):
+        return bool(self._segments) and self.oldest <= generation <= self.newest
+
+    # ----- Recording -----
+    def record(self, grid, generation):
+        cells = np.asarray(grid) != 0
+        if self._last is not None and generation != self.newest + 1:
+            if cells.shape == self._last.shape and generation - 1 in self:
+                self.truncate(generation - 1)
+            else:
+                self.clear()
+        if self._last is None or cells.shape != self._last.shape:
+            self.clear()
+            self._add_segment(generation, cells)
+        elif len(self._segments[-1].deltas) + 1 >= self.keyframe_every:
+            self._add_segment(generation, cells)
+        else:
+            index_type = np.int32 if cells.size < 2 ** 31 else np.int64
+            delta = np.flatnonzero(cells ^ self._last).astype(index_type)
+            segment = self._segments[-1]
+            segment.deltas.append(delta)
+            segment.nbytes += delta.nbytes
+            self._nbytes += delta.nbytes
+        self._last = cells.copy()
+        self._evict()
+
+    def _add_segment(self, generation, cells):
+        segment = _Segment(generation, cells)
+        self._segments.append(segment)
+        self._nbytes += segment.nbytes
+
+    def _evict(self):
+        while self._nbytes > self.max_bytes and len(self._segments) > 1:
+            segment = self._segments.pop(0)
+            self._nbytes -= segment.nbytes
+            if self._cursor is not None and self._cursor[0] is segment:
+                self._cursor = None
+
+    def truncate(self, generation):
+        """Forget every generation after `generation`."""
+        while self._segments and self._segments[-1].start > generation:
+            self._nbytes -= self._segments.pop().nbytes
+        if not self._segments:
+            self.clear()
+            return
+        segment = self._segments[-1]
+        for delta in segment.deltas[generation - segment.start:]:
+            segment.nbytes -= delta.nbytes
+            self._nbytes -= delta.nbytes
+        del segment.deltas[generation - segment.start:]
+        if self._cursor is not None and self._cursor[1] > generation:
+            self._cursor = None
+        self._last = self.seek(generation).astype(bool)
+
+    # ----- Reading -----
+    def _segment_of(self, generation):
+        for segment in reversed(self._segments):
+            if segment.start <= generation:
+                return segment
+        raise IndexError(generation)
+
+    def seek(self, generation):
+        """Return the board at `generation` as a new 0/1 uint8 array."""
+        if generation not in self:
+            raise IndexError(f"Generation {generation} is not in the history ({self.oldest}..{self.newest})")
+        segment = self._segment_of(generation)
+        if self._cursor is not None and self._cursor[0] is segment:
+            _, current, cells = self._cursor
+        else:
+            current, cells = segment.start, segment.unpack()
+
+        flat = cells.reshape(-1)
+        # Delta i of a segment turns generation start + i into start + i + 1.
+        while current < generation:
+            flat[segment.deltas[current - segment.start]] ^= True
+            current += 1
+        while current > generation:
+            current -= 1
+            flat[segment.deltas[current - segment.start]] ^= True
+        self._cursor = (segment, current, cells)
+        return cells.astype(np.uint8)
+
+    def frames(self, start=None, stop=None):
+        """Yield the boards from `start` to `stop` (inclusive; the whole history by default)."""
+        start = self.oldest if start is None else start
+        stop = self.newest if stop is None else stop
+        for generation in range(start, stop + 1):
+            yield self.seek(generation)
+
+    # ----- Export -----
+    def export(self, path, start=None, stop=None, scale=4, fps=10):
+        """
+        Save the history as an animation: a .npy stack of (generations, rows, cols)
+        boards, or an animated GIF (needs Pillow) for any other extension.
+        """
+        if path.lower().endswith(".npy"):
+            np.save(path, np.stack(list(self.frames(start, stop))))
+            return
+        try:
+            from PIL import Image
+        except ImportError:
+            raise ImportError("Exporting a GIF needs Pillow (pip install pillow); use a .npy path instead") from None
+        images = []
+        for frame in self.frames(start, stop):
+            image = Image.fromarray(frame * 255)
+            images.append(image.resize((image.width * scale, image.height * scale), Image.NEAREST))
+        images[0].save(path, save_all=True, append_images=images[1:], duration=int(1000 / fps), loop=0)
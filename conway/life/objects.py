@@ -0,0 +1,107 @@
+"""
+Object census: split a board into connected objects and name them.
+
+Objects are the 8-connected groups of live cells. Each one is reduced to a
+canonical key that is the same for all its rotations and reflections, and
+common still lifes, oscillators and the glider get their usual names; anything
+else is reported by its key ("<width>x<height>:<hex bitmap>").
+"""
+from collections import Counter
+
+import numpy as np
+
+from .engine import step
+from .rules import LIFE
+
+# Plaintext drawings; oscillators and the glider are registered in every phase.
+_NAMED = {
+    "block": ["OO", "OO"],
+    "beehive": [".OO.", "O..O", ".OO."],
+    "loaf": [".OO.", "O..O", ".O.O", "..O."],
+    "boat": ["OO.", "O.O", ".O."],
+    "ship": ["OO.", "O.O", ".OO"],
+    "tub": [".O.", "O.O", ".O."],
+    "pond": [".OO.", "O..O", "O..O", ".OO."],
+    "barge": [".O..", "O.O.", ".O.O", "..O."],
+    "long boat": ["OO..", "O.O.", ".O.O", "..O."],
+    "blinker": ["OOO"],
+    "toad": [".OOO", "OOO."],
+    "glider": [".O.", "..O", "OOO"],
+}
+_PHASES = {"blinker": 2, "toad": 2, "glider": 4}
+
+
+def label(boards):
+    """
+    Label the 8-connected objects of a board or a stack of boards (..., rows, cols).
+
+    Returns an int64 array of the same shape: 0 for dead cells, and the same
+    positive label for every cell of one object. Labels spread to the largest
+    value in each 3x3 neighborhood until nothing changes, all boards at once.
+    """
+    alive = np.asarray(boards) != 0
+    labels = np.where(alive, np.arange(1, alive.size + 1).reshape(alive.shape), 0)
+    rows, cols = alive.shape[-2:]
+    while True:
+        padded = np.pad(labels, [(0, 0)] * (labels.ndim - 2) + [(1, 1), (1, 1)])
+        spread = labels.copy()
+        for dy in range(3):
+            for dx in range(3):
+                np.maximum(spread, padded[..., dy:dy + rows, dx:dx + cols], out=spread)
+        spread[~alive] = 0
+        if np.array_equal(spread, labels):
+            return labels
+        labels = spread
+
+
+def canonical(xs, ys):
+    """Key of a set of cells that does not depend on position, rotation or reflection."""
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
+    keys = []
+    for a, b in ((xs, ys), (ys, xs)):
+        for sa in (1, -1):
+            for sb in (1, -1):
+                u, v = a * sa, b * sb
+                u, v = u - u.min(), v - v.min()
+                bitmap = np.zeros((v.max() + 1, u.max() + 1), dtype=bool)
+                bitmap[v, u] = True
+                keys.append((bitmap.shape[1], bitmap.shape[0], np.packbits(bitmap).tobytes()))
+    width, height, bits = min(keys)
+    return f"{width}x{height}:{bits.hex()}"
+
+
+def _named_keys():
+    names = {}
+    for name, drawing in _NAMED.items():
+        cells = np.array([[char == "O" for char in row] for row in drawing], dtype=np.uint8)
+        board = np.pad(cells, 3)
+        for _ in range(_PHASES.get(name, 1)):
+            ys, xs = np.nonzero(board)
+            names[canonical(xs, ys)] = name
+            board = step(board, LIFE, wrap=False)
+    return names
+
+
+NAMES = _named_keys()
+
+
+def objects(board):
+    """List of (name or key, xs, ys) for every object of a 2D board."""
+    labels = label(board)
+    ys, xs = np.nonzero(labels)
+    if ys.size == 0:
+        return []
+    order = np.argsort(labels[ys, xs], kind="stable")
+    ys, xs = ys[order], xs[order]
+    _, starts = np.unique(labels[ys, xs], return_index=True)
+    found = []
+    for group_xs, group_ys in zip(np.split(xs, starts[1:]), np.split(ys, starts[1:])):
+        key = canonical(group_xs, group_ys)
+        found.append((NAMES.get(key, key), group_xs, group_ys))
+    return found
+
+
+def census(board):
+    """Count the objects of a 2D board by name: Counter({"block": 3, "blinker": 1, ...})."""
+    return Counter(name for name, _, _ in objects(board))
@@ -0,0 +1,162 @@
+"""
+Parallel stepping for giant boards.
+
+The board is cut into horizontal strips, one per worker. Every generation a
+worker reads its strip plus one halo row above and below from the shared source
+buffer and writes the next generation of its strip into the destination buffer;
+the two buffers are then swapped. Each strip runs the same `step` as the serial
+engine, so the result is bit-identical to update_grid.
+
+Two modes are available:
+- "thread": a thread pool in this process; NumPy releases the GIL inside its
+  array loops, so the strips run concurrently.
+- "process": worker processes attached to multiprocessing.shared_memory buffers,
+  synchronised with a barrier after each generation.
+"""
+import multiprocessing as mp
+import os
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .engine import step
+from .rules import LIFE, parse_rule
+
+
+def strip_bounds(rows, workers):
+    """Row ranges [start, stop) that split `rows` rows into `workers` nearly equal strips."""
+    edges = np.linspace(0, rows, workers + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def step_strip(source, target, start, stop, rule, wrap):
+    """Compute rows [start, stop) of the next generation of `source` into `target`."""
+    rows = source.shape[0]
+    if wrap:
+        window = source.take(np.arange(start - 1, stop + 1) % rows, axis=0)
+    else:
+        window = np.zeros((stop - start + 2, source.shape[1]), dtype=source.dtype)
+        top, bottom = max(start - 1, 0), min(stop + 1, rows)
+        window[top - (start - 1):bottom - (start - 1)] = source[top:bottom]
+    target[start:stop] = step(window, rule, wrap)[1:-1]
+
+
+class ParallelStepper:
+    """
+    Step a board with several workers: `grid = stepper(grid)` or `stepper.run(grid, n)`.
+
+    Use it as a context manager (or call close()) so the pool and shared
+    memory are released.
+    """
+
+    def __init__(self, workers=None, rule=LIFE, wrap=True, mode="thread"):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown parallel mode: {mode!r}")
+        self.workers = workers or os.cpu_count() or 1
+        self.rule = parse_rule(rule)
+        self.wrap = wrap
+        self.mode = mode
+        self._executor = None
+        self._processes = None
+        self._shape = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __call__(self, grid):
+        return self.run(grid, 1)
+
+    def run(self, grid, generations):
+        """Advance `grid` by `generations` generations and return the result with the same dtype."""
+        if self.mode == "thread":
+            board = self._run_threads(np.asarray(grid != 0, dtype=np.uint8), generations)
+        else:
+            board = self._run_processes(np.asarray(grid != 0, dtype=np.uint8), generations)
+        return board.astype(grid.dtype)
+
+    # ----- Threads -----
+    def _run_threads(self, board, generations):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers)
+        buffers = [board, np.empty_like(board)]
+        strips = strip_bounds(board.shape[0], self.workers)
+        for generation in range(generations):
+            source, target = buffers[generation % 2], buffers[(generation + 1) % 2]
+            jobs = [self._executor.submit(step_strip, source, target, start, stop, self.rule, self.wrap)
+                    for start, stop in strips]
+            for job in jobs:
+                job.result()
+        return buffers[generations % 2]
+
+    # ----- Processes -----
+    def _start_processes(self, shape):
+        self.close()
+        size = int(np.prod(shape))
+        self._memory = [shared_memory.SharedMemory(create=True, size=max(size, 1)) for _ in range(2)]
+        self._buffers = [np.ndarray(shape, dtype=np.uint8, buffer=m.buf) for m in self._memory]
+        strips = strip_bounds(shape[0], self.workers)
+        context = mp.get_context()
+        barrier = context.Barrier(len(strips))
+        self._pipes = []
+        self._processes = []
+        for start, stop in strips:
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_strip_worker,
+                args=(child, [m.name for m in self._memory], shape, start, stop, self.rule, self.wrap, barrier),
+                daemon=True,
+            )
+            process.start()
+            self._pipes.append(parent)
+            self._processes.append(process)
+        self._shape = shape
+
+    def _run_processes(self, board, generations):
+        if self._processes is None or self._shape != board.shape:
+            self._start_processes(board.shape)
+        self._buffers[0][...] = board
+        for pipe in self._pipes:
+            pipe.send(generations)
+        for pipe in self._pipes:
+            pipe.recv()
+        return self._buffers[generations % 2].copy()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._processes is not None:
+            for pipe in self._pipes:
+                pipe.send(None)
+            for process in self._processes:
+                process.join()
+            self._buffers = None
+            for memory in self._memory:
+                memory.close()
+                memory.unlink()
+            self._processes = None
+            self._shape = None
+
+
+def _strip_worker(pipe, names, shape, start, stop, rule, wrap, barrier):
+    """Process body: run generations on one strip until told to stop."""
+    memory = [shared_memory.SharedMemory(name=name) for name in names]
+    buffers = [np.ndarray(shape, dtype=np.uint8, buffer=m.buf) for m in memory]
+    try:
+        while True:
+            generations = pipe.recv()
+            if generations is None:
+                break
+            for generation in range(generations):
+                step_strip(buffers[generation % 2], buffers[(generation + 1) % 2], start, stop, rule, wrap)
+                # Nobody may read the next generation before every strip has been written.
+                barrier.wait()
+            pipe.send(True)
+    finally:
+        del buffers
+        for m in memory:
+            m.close()
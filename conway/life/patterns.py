@@ -0,0 +1,305 @@
+"""
+Pattern file readers and writers.
+
+Patterns are returned as two integer arrays (xs, ys) of live cell coordinates,
+so engines that do not use a dense grid can load them without clipping.
+
+Supported formats, chosen from the file extension:
+    .rle          Run Length Encoded, with the rule from the "x = .., y = .., rule = .." header
+    .lif, .life   Life 1.06 ("#Life 1.06" followed by one "x y" pair per line)
+    .cells        plaintext ("." dead, "O" alive, "!" comment lines)
+    anything else the "x y" per line format of save_pattern (a "#Life 1.06" first line is also recognised)
+
+RLE files can also be decoded in chunks with iter_rle, so multi-megabyte
+patterns never need their whole body or a dense grid in memory.
+"""
+import os
+import re
+
+import numpy as np
+
+_RLE_TOKEN = re.compile(r"(\d*)([a-zA-Z$!])")
+_TRAILING_DIGITS = re.compile(r"\d*$")
+_RLE_LINE_LENGTH = 70
+LIFE_106_HEADER = "#Life 1.06"
+CHUNK_SIZE = 1 << 20  # characters of RLE body decoded at a time
+
+
+def _empty():
+    return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+
+def _coordinate_pairs(text):
+    """Parse whitespace separated "x y" pairs in one go."""
+    values = np.array(text.split(), dtype=np.int64)
+    if values.size % 2:
+        raise ValueError("odd number of coordinates")
+    pairs = values.reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1]
+
+
+def _normalized(xs, ys):
+    """Live cells sorted row by row without duplicates, moved so the bounding box starts at (0, 0)."""
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
+    if xs.size == 0:
+        return xs, ys
+    keys = np.unique(np.column_stack((ys - ys.min(), xs - xs.min())), axis=0)
+    return keys[:, 1], keys[:, 0]
+
+
+# ----- "x y" coordinates and Life 1.06 -----
+def read_coordinates(path):
+    """Read the "x y" per line format written by save_pattern."""
+    with open(path, "r") as f:
+        return _coordinate_pairs(f.read())
+
+
+def write_coordinates(path, xs, ys):
+    """Write live cells in the "x y" per line format of save_pattern (row by row, left to right)."""
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
+    order = np.lexsort((xs, ys))
+    np.savetxt(path, np.column_stack((xs[order], ys[order])), fmt="%d")
+
+
+def read_life106(path):
+    """Read a Life 1.06 file: "#" lines are header or comments, the rest are "x y" pairs."""
+    with open(path, "r") as f:
+        first = f.readline()
+        if first.startswith("#Life 1.05"):
+            raise ValueError("Life 1.05 files are not supported")
+        lines = [line for line in [first] + f.readlines() if not line.startswith("#")]
+    return _coordinate_pairs("".join(lines))
+
+
+def write_life106(path, xs, ys):
+    """Write live cells as Life 1.06; coordinates are kept as they are (they may be negative)."""
+    xs = np.asarray(xs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64)
+    order = np.lexsort((xs, ys))
+    np.savetxt(path, np.column_stack((xs[order], ys[order])), fmt="%d",
+               header=LIFE_106_HEADER, comments="")
+
+
+# ----- Plaintext -----
+def read_plaintext(path):
+    """Read a plaintext (.cells) pattern: "O" (or "*") is alive, anything else is dead."""
+    with open(path, "r") as f:
+        rows = [line.rstrip("\r\n") for line in f if not line.startswith("!")]
+    width = max((len(row) for row in rows), default=0)
+    if width == 0:
+        return _empty()
+    chars = np.array([row.ljust(width).encode("ascii", "replace") for row in rows], dtype=f"S{width}")
+    chars = chars.view(np.uint8).reshape(len(rows), width)
+    ys, xs = np.nonzero((chars == ord("O")) | (chars == ord("*")))
+    return xs.astype(np.int64), ys.astype(np.int64)
+
+
+def write_plaintext(path, xs, ys):
+    """Write a plaintext (.cells) pattern covering the bounding box of the live cells."""
+    xs, ys = _normalized(xs, ys)
+    name = os.path.splitext(os.path.basename(path))[0]
+    rows = []
+    if xs.size:
+        chars = np.full((ys.max() + 1, xs.max() + 1), ord("."), dtype=np.uint8)
+        chars[ys, xs] = ord("O")
+        rows = [row.tobytes().decode("ascii").rstrip(".") for row in chars]
+    with open(path, "w") as f:
+        f.write(f"!Name: {name}\n")
+        f.writelines(row + "\n" for row in rows)
+
+
+# ----- RLE -----
+def _skip_rle_header(f):
+    """Read past comments and the header line. Returns (header fields, first line of the body)."""
+    header = {}
+    while True:
+        line = f.readline()
+        if not line:
+            return header, ""
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("x") and "=" in line and not header:
+            header = dict(
+                (key.strip().lower(), value.strip())
+                for key, value in (item.split("=", 1) for item in line.split(",") if "=" in item)
+            )
+            continue
+        return header, line
+
+
+def _decode_rle(body, row=0, column=0):
+    """
+    Decode RLE tokens that start at (column, row) without a per-cell loop.
+    Returns (xs, ys, row, column) where the last two are the position after the last token.
+    """
+    tokens = _RLE_TOKEN.findall(body)
+    if not tokens:
+        return _empty() + (row, column)
+    runs = np.array([int(count) if count else 1 for count, _ in tokens], dtype=np.int64)
+    tags = np.array([tag for _, tag in tokens])
+
+    is_newline = tags == "$"
+    advance = np.where(is_newline, 0, runs)
+    breaks = np.where(is_newline, runs, 0)
+    # Row of each token: number of line breaks before it.
+    token_row = row + np.cumsum(breaks) - breaks
+    # Column where each token starts: running total of cells, reset after every "$".
+    total = np.cumsum(advance)
+    last_newline = np.maximum.accumulate(np.where(is_newline, np.arange(len(tags)), -1))
+    line_start = np.where(last_newline >= 0, total[np.maximum(last_newline, 0)], -column)
+    token_column = total - advance - line_start
+
+    # Any state letter other than "b" is a live cell (multi-state files use A, B, ...).
+    alive = ~is_newline & (tags != "b")
+    lengths = runs[alive]
+    starts = np.repeat(token_column[alive], lengths)
+    within_run = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    xs, ys = starts + within_run, np.repeat(token_row[alive], lengths)
+    return xs, ys, row + int(breaks.sum()), int(total[-1] - line_start[-1])
+
+
+def _iter_rle_body(f, first_line, chunk_size):
+    """Decode the body that starts with `first_line` and continues in `f`, chunk by chunk."""
+    row, column = 0, 0
+    pending = first_line
+    while True:
+        chunk = f.read(chunk_size)
+        text = "".join((pending + chunk).split())
+        finished = not chunk or "!" in text
+        if finished:
+            text = text.split("!", 1)[0]
+            pending = ""
+        else:
+            # Keep a run count cut at the chunk boundary for the next chunk.
+            cut = _TRAILING_DIGITS.search(text).start()
+            text, pending = text[:cut], text[cut:]
+        xs, ys, row, column = _decode_rle(text, row, column)
+        if xs.size:
+            yield xs, ys
+        if finished:
+            return
+
+
+def iter_rle(path, chunk_size=CHUNK_SIZE):
+    """Yield (xs, ys) arrays for an RLE file, decoding about `chunk_size` characters at a time."""
+    with open(path, "r") as f:
+        _, first_line = _skip_rle_header(f)
+        yield from _iter_rle_body(f, first_line, chunk_size)
+
+
+def read_rle(path, chunk_size=CHUNK_SIZE):
+    """
+    Read a Run Length Encoded pattern such as osilator.rle.
+
+    Returns (xs, ys, rule) where rule is the rulestring of the header, or None
+    if the header does not name one.
+    """
+    with open(path, "r") as f:
+        header, first_line = _skip_rle_header(f)
+        chunks = list(_iter_rle_body(f, first_line, chunk_size))
+    if not chunks:
+        return _empty() + (header.get("rule"),)
+    xs, ys = (np.concatenate(part) for part in zip(*chunks))
+    return xs, ys, header.get("rule")
+
+
+def decode_rle(body):
+    """Decode an RLE body ("bo$2bo$3o!") into coordinate arrays without a per-cell loop."""
+    xs, ys, _, _ = _decode_rle(body.split("!", 1)[0])
+    return xs, ys
+
+
+def _rle_run(count, tag):
+    return f"{count}{tag}" if count > 1 else tag
+
+
+def write_rle(path, xs, ys, rule=None):
+    """Write live cells as RLE, moved so the bounding box starts at (0, 0), with an optional rule header."""
+    xs, ys = _normalized(xs, ys)
+    width = int(xs.max()) + 1 if xs.size else 0
+    height = int(ys.max()) + 1 if ys.size else 0
+    header = f"x = {width}, y = {height}" + (f", rule = {rule}" if rule is not None else "")
+
+    tokens = []
+    if xs.size:
+        # Horizontal runs of live cells: a run starts wherever the row changes or a gap opens.
+        starts_run = np.ones(xs.size, dtype=bool)
+        starts_run[1:] = (ys[1:] != ys[:-1]) | (xs[1:] != xs[:-1] + 1)
+        starts = np.flatnonzero(starts_run)
+        lengths = np.diff(np.append(starts, xs.size))
+        run_x, run_y = xs[starts], ys[starts]
+        previous_row = np.concatenate(([0], run_y[:-1]))
+        previous_end = np.concatenate(([0], (run_x + lengths)[:-1]))
+        newlines = run_y - previous_row
+        dead = np.where(newlines > 0, run_x, run_x - previous_end)
+        for newline, gap, length in zip(newlines.tolist(), dead.tolist(), lengths.tolist()):
+            if newline:
+                tokens.append(_rle_run(newline, "$"))
+            if gap:
+                tokens.append(_rle_run(gap, "b"))
+            tokens.append(_rle_run(length, "o"))
+    tokens.append("!")
+
+    lines, line = [], ""
+    for token in tokens:
+        if len(line) + len(token) > _RLE_LINE_LENGTH:
+            lines.append(line)
+            line = ""
+        line += token
+    lines.append(line)
+    with open(path, "w") as f:
+        f.write(header + "\n")
+        f.write("\n".join(lines) + "\n")
+
+
+# ----- Choosing the format -----
+def _format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".rle":
+        return "rle"
+    if extension in (".lif", ".life"):
+        return "life106"
+    if extension == ".cells":
+        return "plaintext"
+    return "coordinates"
+
+
+def read_pattern(path):
+    """Read a pattern file, choosing the format from its extension. Returns (xs, ys, rule)."""
+    kind = _format(path)
+    if kind == "rle":
+        return read_rle(path)
+    if kind == "plaintext":
+        xs, ys = read_plaintext(path)
+    elif kind == "life106":
+        xs, ys = read_life106(path)
+    else:
+        with open(path, "r") as f:
+            life106 = f.readline().startswith("#Life")
+        xs, ys = read_life106(path) if life106 else read_coordinates(path)
+    return xs, ys, None
+
+
+def iter_pattern(path, chunk_size=CHUNK_SIZE):
+    """Yield (xs, ys) chunks of a pattern file; only RLE is actually streamed."""
+    if _format(path) == "rle":
+        yield from iter_rle(path, chunk_size)
+        return
+    xs, ys, _ = read_pattern(path)
+    yield xs, ys
+
+
+def write_pattern(path, xs, ys, rule=None):
+    """Write a pattern file, choosing the format from its extension (only RLE stores the rule)."""
+    kind = _format(path)
+    if kind == "rle":
+        write_rle(path, xs, ys, rule)
+    elif kind == "life106":
+        write_life106(path, xs, ys)
+    elif kind == "plaintext":
+        write_plaintext(path, xs, ys)
+    else:
+        write_coordinates(path, xs, ys)
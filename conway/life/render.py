@@ -0,0 +1,104 @@
+"""
+Blit-based rendering for the pygame front-ends.
+
+The grid is written into a one-pixel-per-cell 8-bit surface with
+pygame.surfarray, scaled to the cell size in a single call, and blitted once,
+instead of issuing one pygame.draw.rect per cell.
+
+Only the cells that fall inside the screen are touched, and below one pixel per
+cell (cell_size < 1) each pixel shows a block of cells, alive if any cell of the
+block is alive. Either way the work per frame depends on the screen size, not
+on the board size.
+"""
+import numpy as np
+import pygame
+
+
+def _palette(dead_color, alive_color):
+    return [dead_color, alive_color] + [(0, 0, 0)] * 254
+
+
+def visible_window(length, offset, cell_size, screen_length):
+    """First and one-past-last cell index along one axis that lands on the screen."""
+    start = max(0, -offset // cell_size)
+    stop = min(length, (screen_length - offset + cell_size - 1) // cell_size)
+    return start, max(start, stop)
+
+
+def max_pool(cells, block):
+    """Downsample a 2D 0/1 array by `block`: a block is alive if any of its cells is."""
+    rows, cols = cells.shape
+    padded = np.zeros((-(-rows // block) * block, -(-cols // block) * block), dtype=np.uint8)
+    padded[:rows, :cols] = cells
+    return padded.reshape(padded.shape[0] // block, block, -1, block).max(axis=(1, 3))
+
+
+class GridRenderer:
+    """
+    Draws 0/1 grids with two colours.
+
+    Grids are indexed [y, x] like base.py; pass columns_first=True for boards
+    indexed [x, y] like Tablero in a.py. Scratch surfaces are cached and only
+    rebuilt when the size of the visible window or the zoom changes.
+    """
+
+    def __init__(self, alive_color, dead_color, columns_first=False):
+        self.palette = _palette(dead_color, alive_color)
+        self.columns_first = columns_first
+        self._cells = None
+        self._scaled = None
+
+    def _surface(self, size):
+        surface = pygame.Surface(size, depth=8)
+        surface.set_palette(self.palette)
+        return surface
+
+    def _rows(self, grid):
+        """View of `grid` indexed [y, x], whatever the board's own order is."""
+        grid = np.asarray(grid)
+        return grid.T if self.columns_first else grid
+
+    def _scale(self, rows, cell_size):
+        """Surface for a [y, x] block of cells at an integer `cell_size`."""
+        cells = np.asarray(rows != 0, dtype=np.uint8).T
+        size = cells.shape
+        if self._cells is None or self._cells.get_size() != size:
+            self._cells = self._surface(size)
+        pygame.surfarray.blit_array(self._cells, cells)
+        if cell_size == 1:
+            return self._cells
+
+        scaled_size = (size[0] * cell_size, size[1] * cell_size)
+        if self._scaled is None or self._scaled.get_size() != scaled_size:
+            self._scaled = self._surface(scaled_size)
+        pygame.transform.scale(self._cells, scaled_size, self._scaled)
+        return self._scaled
+
+    def render(self, grid, cell_size):
+        """Return a surface showing the whole of `grid` with `cell_size` pixels per cell."""
+        return self._scale(self._rows(grid), cell_size)
+
+    def draw(self, screen, grid, offset_x, offset_y, cell_size):
+        """Blit the part of `grid` that is visible on `screen`, with the board's top-left at the offset."""
+        rows = self._rows(grid)
+        screen_width, screen_height = screen.get_size()
+        if cell_size >= 1:
+            cell_size = int(cell_size)
+            x0, x1 = visible_window(rows.shape[1], offset_x, cell_size, screen_width)
+            y0, y1 = visible_window(rows.shape[0], offset_y, cell_size, screen_height)
+            if x0 == x1 or y0 == y1:
+                return
+            surface = self._scale(rows[y0:y1, x0:x1], cell_size)
+            screen.blit(surface, (offset_x + x0 * cell_size, offset_y + y0 * cell_size))
+            return
+
+        # Zoomed out past one pixel per cell: one pixel per block x block cells.
+        block = int(round(1 / cell_size))
+        blocks_x, blocks_y = -(-rows.shape[1] // block), -(-rows.shape[0] // block)
+        x0, x1 = visible_window(blocks_x, offset_x, 1, screen_width)
+        y0, y1 = visible_window(blocks_y, offset_y, 1, screen_height)
+        if x0 == x1 or y0 == y1:
+            return
+        window = rows[y0 * block:y1 * block, x0 * block:x1 * block]
+        surface = self._scale(max_pool(window != 0, block), 1)
+        screen.blit(surface, (offset_x + x0, offset_y + y0))
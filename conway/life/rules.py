@@ -0,0 +1,98 @@
+"""
+Rulestring parsing for Life-like cellular automata.
+
+A rule such as ``B3/S23`` is compiled once into a lookup table indexed by
+(state, neighbor count), so every variant runs through the same vectorized step.
+"""
+import re
+
+import numpy as np
+
+# "B3/S23", "b2/s23", or the bare "B2n3/S23" once split into its two halves.
+_BS_PATTERN = re.compile(r"^B([0-8a-z]*)/S([0-8]*)$", re.IGNORECASE)
+_SB_PATTERN = re.compile(r"^([0-8]*)/([0-8]*)$")
+_HEADER_PATTERN = re.compile(r"rule\s*=\s*([^,\s]+)", re.IGNORECASE)
+
+
+class Rule:
+    """
+    A Life-like rule compiled into ``table[state, neighbors] -> next state``.
+
+    ``birth`` and ``survival`` are the neighbor counts of the rulestring. The
+    diagonal-birth variant from sliders.py (a dead cell with exactly two
+    neighbors is born only if they are opposite corners) is written ``B2n`` in
+    Hensel notation and stored in ``birth_2n``; it cannot be expressed by a
+    count alone, so the engine applies it as an extra mask.
+    """
+
+    def __init__(self, birth, survival, birth_2n=False):
+        self.birth = frozenset(birth)
+        self.survival = frozenset(survival)
+        self.birth_2n = birth_2n and 2 not in self.birth
+        if not self.birth.union(self.survival) <= set(range(9)):
+            raise ValueError(f"Neighbor counts must be between 0 and 8: {self}")
+        self.table = np.zeros((2, 9), dtype=np.uint8)
+        self.table[0, sorted(self.birth)] = 1
+        self.table[1, sorted(self.survival)] = 1
+        # Flattened copy indexed by ``neighbors | state << 4`` for np.take.
+        self.flat_table = np.zeros(32, dtype=np.uint8)
+        self.flat_table[:9] = self.table[0]
+        self.flat_table[16:25] = self.table[1]
+
+    def __str__(self):
+        birth = sorted(self.birth | ({2} if self.birth_2n else set()))
+        digits = "".join(f"{n}n" if n == 2 and self.birth_2n else str(n) for n in birth)
+        return f"B{digits}/S{''.join(map(str, sorted(self.survival)))}"
+
+    def __repr__(self):
+        return f"Rule('{self}')"
+
+    def __eq__(self, other):
+        return isinstance(other, Rule) and str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+
+def _parse_birth(digits):
+    """Split the birth half into counts, accepting the ``2n`` diagonal condition only."""
+    birth = set()
+    birth_2n = False
+    for count, letters in re.findall(r"([0-8])([a-z]*)", digits.lower()):
+        if not letters:
+            birth.add(int(count))
+        elif count == "2" and letters == "n":
+            birth_2n = True
+        else:
+            raise ValueError(f"Unsupported non-totalistic condition: B{count}{letters}")
+    if re.sub(r"[0-8][a-z]*", "", digits.lower()):
+        raise ValueError(f"Invalid birth conditions: {digits}")
+    return birth, birth_2n
+
+
+def parse_rule(text):
+    """
+    Build a Rule from a rulestring.
+
+    Accepts ``B3/S23`` style strings (case-insensitive), the older ``23/3``
+    survival/birth notation, and RLE header lines such as
+    ``x = 22, y = 7, rule = B3/S23``.
+    """
+    if isinstance(text, Rule):
+        return text
+    rulestring = text.strip()
+    header = _HEADER_PATTERN.search(rulestring)
+    if header:
+        rulestring = header.group(1)
+
+    match = _BS_PATTERN.match(rulestring)
+    if match:
+        birth, birth_2n = _parse_birth(match.group(1))
+        return Rule(birth, map(int, match.group(2)), birth_2n)
+    match = _SB_PATTERN.match(rulestring)
+    if match:
+        return Rule(map(int, match.group(2)), map(int, match.group(1)))
+    raise ValueError(f"Unrecognized rulestring: {text!r}")
+
+
+LIFE = parse_rule("B3/S23")
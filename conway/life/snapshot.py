@@ -0,0 +1,126 @@
+"""
+Binary board snapshots for checkpointing and resuming long runs.
+
+Layout of a snapshot file (all integers little-endian):
+
+    magic       8 bytes   b"LIFESNAP"
+    version     uint16
+    flags       uint16    bit 0: payload is zlib-compressed
+    rows        uint64
+    cols        uint64
+    generation  uint64
+    meta size   uint32    length of the JSON metadata that follows
+    metadata    JSON      {"rule": "B3/S23", "clock": {...}} (clock state of clock2.py, or null)
+    padding     zeros up to the next multiple of 64 bytes
+    payload     the board bit-packed like life/bitpack.py: rows x words_per_row(cols) uint64 words
+
+An uncompressed payload is opened with np.memmap, so even multi-gigabyte
+boards load instantly and can be stepped directly with step_packed.
+"""
+import json
+import struct
+import zlib
+
+import numpy as np
+
+from .bitpack import pack_grid, unpack_grid, words_per_row
+from .rules import LIFE, parse_rule
+
+MAGIC = b"LIFESNAP"
+VERSION = 1
+COMPRESSED = 1
+_HEADER = struct.Struct("<8sHHQQQI")
+_ALIGNMENT = 64
+_WORD = np.dtype("<u8")
+_ROWS_PER_BLOCK = 4096  # rows compressed or decompressed at a time
+
+
+def save_snapshot(path, grid, rule=LIFE, generation=0, clock=None, compress=False):
+    """Save a dense 0/1 grid; see save_packed_snapshot for the arguments."""
+    save_packed_snapshot(path, pack_grid(grid), grid.shape[1], rule, generation, clock, compress)
+
+
+def save_packed_snapshot(path, packed, width, rule=LIFE, generation=0, clock=None, compress=False):
+    """
+    Save a bit-packed board of `width` columns.
+
+    `clock` is any JSON-serialisable value (clock2.py stores its clock and wave
+    state). Compression makes the file smaller but it can no longer be memory-mapped.
+    """
+    rows = packed.shape[0]
+    meta = json.dumps({"rule": str(parse_rule(rule)), "clock": clock}).encode("utf-8")
+    header = _HEADER.pack(MAGIC, VERSION, COMPRESSED if compress else 0, rows, width, generation, len(meta))
+    padding = -(len(header) + len(meta)) % _ALIGNMENT
+    with open(path, "wb") as f:
+        f.write(header + meta + b"\0" * padding)
+        if not compress:
+            np.ascontiguousarray(packed, dtype=_WORD).tofile(f)
+            return
+        compressor = zlib.compressobj()
+        for start in range(0, rows, _ROWS_PER_BLOCK):
+            block = np.ascontiguousarray(packed[start:start + _ROWS_PER_BLOCK], dtype=_WORD)
+            f.write(compressor.compress(block.tobytes()))
+        f.write(compressor.flush())
+
+
+def read_header(path):
+    """
+    Read only the header of a snapshot. Returns a dict with shape (rows, cols),
+    rule (a Rule), generation, clock, compressed and offset (start of the payload).
+    """
+    with open(path, "rb") as f:
+        fixed = f.read(_HEADER.size)
+        if len(fixed) < _HEADER.size or fixed[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        _, version, flags, rows, cols, generation, meta_size = _HEADER.unpack(fixed)
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        meta = json.loads(f.read(meta_size).decode("utf-8"))
+    offset = _HEADER.size + meta_size
+    return {
+        "shape": (rows, cols),
+        "rule": parse_rule(meta["rule"]),
+        "generation": generation,
+        "clock": meta.get("clock"),
+        "compressed": bool(flags & COMPRESSED),
+        "offset": offset + (-offset % _ALIGNMENT),
+    }
+
+
+def load_packed(path, mode="r"):
+    """
+    Open the bit-packed board of a snapshot. Returns (packed, header).
+
+    Uncompressed payloads are memory-mapped (mode "r" read-only, "r+" to write
+    back into the file, "c" copy-on-write); compressed ones are read into memory.
+    """
+    header = read_header(path)
+    rows, cols = header["shape"]
+    shape = (rows, words_per_row(cols))
+    if not header["compressed"]:
+        if rows == 0 or shape[1] == 0:
+            return np.zeros(shape, dtype=_WORD), header
+        return np.memmap(path, dtype=_WORD, mode=mode, offset=header["offset"], shape=shape), header
+
+    packed = np.empty(shape, dtype=_WORD)
+    target = packed.reshape(-1).view(np.uint8)
+    decompressor = zlib.decompressobj()
+    filled = 0
+    with open(path, "rb") as f:
+        f.seek(header["offset"])
+        while True:
+            data = f.read(_ROWS_PER_BLOCK * shape[1] * _WORD.itemsize)
+            chunk = decompressor.decompress(data) if data else decompressor.flush()
+            target[filled:filled + len(chunk)] = np.frombuffer(chunk, dtype=np.uint8)
+            filled += len(chunk)
+            if not data:
+                break
+    if filled != target.size:
+        raise ValueError(f"{path}: truncated snapshot payload")
+    return packed, header
+
+
+def load_snapshot(path, dtype=int):
+    """Load a snapshot as a dense (rows, cols) grid. Returns (grid, header)."""
+    packed, header = load_packed(path)
+    return unpack_grid(packed, header["shape"][1], dtype), header
@@ -0,0 +1,60 @@
+"""
+Stochastic variants of a rule, driven by numpy.random.Generator.
+
+A live cell that the rule would kill for having too few neighbors (fewer than
+the smallest survival count) survives with probability `underpop`, one with too
+many (more than the largest survival count) with probability `overpop`, and a
+cell that the rule would bring to life is born with probability `birth`. One
+array of uniform numbers is drawn per generation and every probability is
+applied as a mask, so batches of boards (batch, rows, cols) work as well.
+
+Every stepper owns its Generator. Seed it explicitly, and give parallel or
+batch runs their own streams with stream_seeds, to make runs reproducible.
+"""
+import numpy as np
+
+from .engine import apply_rule, count_neighbors
+from .rules import LIFE, parse_rule
+
+
+def stream_seeds(seed, count):
+    """`count` independent seeds derived from one run seed (one per worker, batch or run)."""
+    return np.random.SeedSequence(seed).spawn(count)
+
+
+class StochasticStepper:
+    """
+    Callable that advances a grid one generation: `grid = stepper(grid)`.
+
+    With all probabilities at their defaults (0, 0, 1) it gives the same
+    result as life.engine.step.
+    """
+
+    def __init__(self, rule=LIFE, underpop=0.0, overpop=0.0, birth=1.0, seed=None, wrap=True):
+        rule = parse_rule(rule)
+        self.rule = rule
+        self.underpop = underpop
+        self.overpop = overpop
+        self.birth = birth
+        self.wrap = wrap
+        self.rng = np.random.default_rng(seed)
+        survival = sorted(rule.survival)
+        # Counts below / above every survival count; a rule without survival kills every live cell.
+        self._fewest = survival[0] if survival else 9
+        self._most = survival[-1] if survival else -1
+
+    def __call__(self, grid):
+        alive = (np.asarray(grid) != 0).view(np.uint8)
+        counts = count_neighbors(alive, self.wrap)
+        new_grid = apply_rule(alive, counts, self.rule, self.wrap)
+        draw = self.rng.random(alive.shape, dtype=np.float32)
+
+        lives = alive.astype(bool)
+        dies = lives & (new_grid == 0)
+        rescued = dies & (counts < self._fewest) & (draw < self.underpop)
+        rescued |= dies & (counts > self._most) & (draw < self.overpop)
+        new_grid[rescued] = 1
+        if self.birth < 1:
+            # Live and dead cells never use the same number, so one draw covers both.
+            new_grid[~lives & (new_grid == 1) & (draw >= self.birth)] = 0
+        return new_grid.astype(grid.dtype)
@@ -0,0 +1,128 @@
+"""
+Background simulation thread for the pygame front-ends.
+
+The worker owns the grid and steps it at a target rate on its own thread, so a
+slow generation no longer drops frames and slow drawing no longer stalls the
+simulation. The render loop asks for the latest completed generation with
+latest(); every change made by the UI goes through edit() or replace().
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+class SimulationWorker(threading.Thread):
+    """
+    Step `grid` with `advance` (e.g. update_grid) at `steps_per_second` generations per second.
+    `on_step(grid, generation)`, if given, is called on the simulation thread after every
+    generation has been published, while the grid is still locked (e.g. History.record), so
+    it never races edit() or the UI code that runs inside it; if it returns True the worker
+    pauses (e.g. the board has settled into a cycle).
+
+    Each generation is computed into a new array (the back buffer) without
+    holding the lock and then published with a reference swap, so the renderer
+    never sees a half-updated board and edits never wait for a generation. If
+    the board was edited or replaced while a generation was being computed,
+    that generation is dropped and computed again from the edited board. When
+    a generation takes longer than its time slot, the worker runs as fast as it
+    can and does not try to catch up on the missed steps.
+    """
+
+    def __init__(self, grid, advance, steps_per_second=10.0, paused=True, on_step=None):
+        super().__init__(daemon=True)
+        self._grid = grid
+        self._advance = advance
+        self._on_step = on_step
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._paused = paused
+        self._running = True
+        self.steps_per_second = steps_per_second
+        self.generation = 0
+        self._version = 0  # bumped by every edit, so a generation computed meanwhile is dropped
+
+    # ----- Control from the UI thread -----
+    @property
+    def paused(self):
+        return self._paused
+
+    @paused.setter
+    def paused(self, value):
+        with self._wake:
+            self._paused = value
+            self._wake.notify()
+
+    def latest(self):
+        """The last completed generation. Treat it as read-only; use edit() to change cells."""
+        return self._grid
+
+    @contextmanager
+    def edit(self):
+        """Hold the simulation between generations and yield the grid for in-place changes."""
+        with self._lock:
+            self._version += 1
+            # Any cell may change: steppers that track changes (TiledStepper) start over.
+            reset = getattr(self._advance, "reset", None)
+            if reset is not None:
+                reset()
+            yield self._grid
+
+    def set_cell(self, y, x, value):
+        """Set one cell (ignored outside the board); only a real change counts as an edit."""
+        y, x = int(y), int(x)
+        with self._lock:
+            grid = self._grid
+            if 0 <= y < grid.shape[0] and 0 <= x < grid.shape[1] and grid[y, x] != value:
+                grid[y, x] = value
+                self._version += 1
+                mark_dirty = getattr(self._advance, "mark_dirty", None)
+                if mark_dirty is not None:
+                    mark_dirty(y, x)
+
+    def replace(self, grid, generation=None):
+        """Swap in a whole new grid (clear, reset, load), optionally with its generation number."""
+        with self._lock:
+            self._grid = grid
+            self._version += 1
+            if generation is not None:
+                self.generation = generation
+
+    def stop(self):
+        with self._wake:
+            self._running = False
+            self._wake.notify()
+        self.join()
+
+    # ----- Simulation thread -----
+    def run(self):
+        next_step = time.perf_counter()
+        while True:
+            with self._wake:
+                while self._running and self._paused:
+                    self._wake.wait()
+                    next_step = time.perf_counter()
+                if not self._running:
+                    return
+                grid, version = self._grid, self._version
+
+            new_grid = self._advance(grid)
+            with self._lock:
+                if self._version != version:
+                    # Edited meanwhile: drop this generation and step the edited board instead.
+                    # Steppers that keep state between calls (TiledStepper) start over.
+                    reset = getattr(self._advance, "reset", None)
+                    if reset is not None:
+                        reset()
+                    continue
+                self._grid = new_grid
+                self.generation += 1
+                if self._on_step is not None and self._on_step(new_grid, self.generation):
+                    self._paused = True
+
+            # Aim for an even rhythm; if we fell behind, restart the schedule from now.
+            now = time.perf_counter()
+            next_step = max(next_step + 1.0 / self.steps_per_second, now)
+            delay = next_step - now
+            if delay > 0:
+                with self._wake:
+                    self._wake.wait(delay)
@@ -0,0 +1,294 @@
+"""
+Headless batch runner: step a pattern as fast as possible, with no window and no rendering.
+
+Example (from the repository root):
+    python -m conway.run --pattern pattern.txt --rule B3/S23 --generations 100000
+
+The pattern can be in any format of life/patterns.py ("x y" lines as written by
+save_pattern, RLE, Life 1.06 or plaintext); the final pattern is written in the
+format given by the extension of --output, and population statistics and
+generations per second are printed.
+
+With --on-cycle stop the run ends as soon as the board repeats an earlier
+generation (still life, oscillator or empty board); with --on-cycle skip it
+jumps straight to the final generation using the detected period.
+
+A long run can be checkpointed with --checkpoint board.snap and resumed later
+with --pattern board.snap (see life/snapshot.py); the board size, rule and
+generation count come from the snapshot.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from .life.bitpack import pack_grid, population as packed_population, step_packed, unpack_grid
+from .life.cycles import CycleDetector, cells_digest, grid_digest, packed_digest
+from .life.engine import step
+from .life.hashlife import HashLife
+from .life.parallel import ParallelStepper
+from .life.patterns import read_pattern, write_pattern
+from .life.rules import LIFE, parse_rule
+from .life.snapshot import load_packed, save_packed_snapshot
+from .life.sparse import SparseLife
+from .life.stochastic import StochasticStepper
+from .life.tiles import TiledStepper
+
+# Same board as base.py: 1200x800 pixels with 10-pixel cells.
+GRID_WIDTH, GRID_HEIGHT = 120, 80
+ENGINES = ["dense", "bitpacked", "tiled", "parallel", "sparse", "hashlife"]
+
+
+def resolve_pattern_path(filename):
+    """Use the path as given if it exists, otherwise look next to this script like get_pattern_file_path."""
+    if os.path.exists(filename):
+        return filename
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+
+
+# ----- Engine adapters: step(n), population, cells(), digest() -----
+def place_cells(xs, ys, shape):
+    """A uint8 grid of `shape` with the given cells alive."""
+    grid = np.zeros(shape, dtype=np.uint8)
+    # Same bounds check as load_pattern: cells outside the board are dropped.
+    inside = (xs >= 0) & (xs < shape[1]) & (ys >= 0) & (ys < shape[0])
+    grid[ys[inside], xs[inside]] = 1
+    return grid
+
+
+class DenseBoard:
+    """A torus of fixed size, stepped by the vectorized engine (or the tiled/parallel steppers)."""
+
+    def __init__(self, grid, rule, stepper=None):
+        self.rule = rule
+        self.grid = grid
+        self.stepper = stepper
+
+    def step(self, generations):
+        if isinstance(self.stepper, ParallelStepper):
+            self.grid = self.stepper.run(self.grid, generations)
+            return
+        for _ in range(generations):
+            self.grid = self.stepper(self.grid) if self.stepper else step(self.grid, self.rule)
+
+    @property
+    def population(self):
+        return int(np.count_nonzero(self.grid))
+
+    def cells(self):
+        ys, xs = np.nonzero(self.grid)
+        return xs, ys
+
+    def digest(self):
+        return grid_digest(self.grid)
+
+    def close(self):
+        if isinstance(self.stepper, ParallelStepper):
+            self.stepper.close()
+
+
+class PackedBoard(DenseBoard):
+    """A torus of fixed size stored 64 cells per word (a snapshot's memmap is stepped as is)."""
+
+    def __init__(self, packed, width, rule):
+        super().__init__(None, rule)
+        self.width = width
+        self.packed = packed
+
+    def step(self, generations):
+        for _ in range(generations):
+            self.packed = step_packed(self.packed, self.width, self.rule)
+
+    @property
+    def population(self):
+        return packed_population(self.packed)
+
+    def cells(self):
+        ys, xs = np.nonzero(unpack_grid(self.packed, self.width, np.uint8))
+        return xs, ys
+
+    def digest(self):
+        return packed_digest(self.packed, self.width)
+
+
+def read_start(path):
+    """
+    Read the starting board. Returns (start, rule, generation, shape) where start is
+    the (xs, ys) cells of a pattern or the bit-packed board of a snapshot (memory-mapped
+    when uncompressed); rule and shape are None unless the file names them (RLE header, snapshot).
+    """
+    if path.lower().endswith(".snap"):
+        packed, header = load_packed(path)
+        return packed, header["rule"], header["generation"], header["shape"]
+    xs, ys, rule = read_pattern(path)
+    return (xs, ys), rule, 0, None
+
+
+def make_board(engine, start, rule, shape, workers=None):
+    """
+    Build the board for `engine` from read_start's start; sparse and hashlife run on the
+    unbounded plane and are the only engines that go through cell coordinates for a snapshot.
+    """
+    packed = start if isinstance(start, np.ndarray) else None
+    if engine in ("sparse", "hashlife"):
+        if packed is not None:
+            ys, xs = np.nonzero(unpack_grid(packed, shape[1], np.uint8))
+        else:
+            xs, ys = start
+        return SparseLife(xs, ys, rule) if engine == "sparse" else HashLife.from_cells(xs, ys, rule)
+    if engine == "bitpacked":
+        return PackedBoard(packed if packed is not None else pack_grid(place_cells(*start, shape)), shape[1], rule)
+    grid = unpack_grid(packed, shape[1], np.uint8) if packed is not None else place_cells(*start, shape)
+    if engine == "dense":
+        return DenseBoard(grid, rule)
+    if engine == "tiled":
+        return DenseBoard(grid, rule, TiledStepper(rule))
+    if engine == "parallel":
+        return DenseBoard(grid, rule, ParallelStepper(workers, rule))
+    raise ValueError(f"Unknown engine: {engine!r}")
+
+
+def board_digest(board):
+    """Digest of the current generation, for cycle detection."""
+    if hasattr(board, "digest"):
+        return board.digest()
+    return cells_digest(*board.cells())
+
+
+def run(board, generations, sample_every, on_cycle=None):
+    """
+    Step `generations` generations, sampling the population.
+
+    With on_cycle ("stop" or "skip") every generation is hashed; once the board
+    repeats itself the run stops there, or jumps to the last generation.
+    Returns (populations, seconds stepping, generations done, cycle) where cycle
+    is (first generation of the cycle, period) or None.
+    """
+    populations = [board.population]
+    detector = None
+    if on_cycle:
+        detector = CycleDetector(window=generations + 1)
+        detector.observe(board_digest(board), 0)
+    elapsed = 0.0
+    done = 0
+    while done < generations and (detector is None or detector.cycle is None):
+        chunk = min(sample_every, generations - done)
+        start = time.perf_counter()
+        if detector is None:
+            board.step(chunk)
+            done += chunk
+        else:
+            for _ in range(chunk):
+                board.step(1)
+                done += 1
+                if detector.observe(board_digest(board), done) is not None:
+                    if on_cycle == "skip":
+                        # The state repeats every `period` generations from here on.
+                        board.step((generations - done) % detector.cycle[1])
+                        done = generations
+                    break
+        elapsed += time.perf_counter() - start
+        populations.append(board.population)
+    return np.array(populations), elapsed, done, detector.cycle if detector else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pattern", default="pattern.txt",
+                        help="pattern file (x y per line, .rle, .lif, .cells) or a .snap snapshot to resume")
+    parser.add_argument("--rule", default=None, help="rulestring, e.g. B3/S23 (default: RLE header or B3/S23)")
+    parser.add_argument("--generations", type=int, default=1000)
+    parser.add_argument("--engine", choices=ENGINES, default="dense")
+    parser.add_argument("--width", type=int, default=GRID_WIDTH, help="board columns (bounded engines)")
+    parser.add_argument("--height", type=int, default=GRID_HEIGHT, help="board rows (bounded engines)")
+    parser.add_argument("--offset", type=int, nargs=2, default=(0, 0), metavar=("X", "Y"),
+                        help="shift the pattern like load_pattern's offset")
+    parser.add_argument("--workers", type=int, default=None, help="workers for the parallel engine")
+    parser.add_argument("--sample-every", type=int, default=None,
+                        help="generations between population samples (default: 1/1000 of the run)")
+    parser.add_argument("--output", default=None,
+                        help="where to save the final pattern; .rle keeps the rule (default: <pattern>-final.txt)")
+    parser.add_argument("--underpop", type=float, default=0.0,
+                        help="probability that a cell dying of underpopulation survives (stochastic mode)")
+    parser.add_argument("--overpop", type=float, default=0.0,
+                        help="probability that a cell dying of overpopulation survives (stochastic mode)")
+    parser.add_argument("--birth", type=float, default=1.0, help="probability that a birth happens (stochastic mode)")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the stochastic mode, to repeat a run")
+    parser.add_argument("--on-cycle", choices=["stop", "skip"], default=None,
+                        help="hash every generation and stop, or skip to the end, once the board repeats")
+    parser.add_argument("--checkpoint", default=None,
+                        help="also save the final board as a binary snapshot (bounded engines)")
+    args = parser.parse_args(argv)
+
+    bounded = args.engine not in ("sparse", "hashlife")
+    stochastic = (args.underpop, args.overpop, args.birth) != (0.0, 0.0, 1.0)
+    if stochastic and args.engine != "dense":
+        parser.error("--underpop, --overpop and --birth need the dense engine")
+    if stochastic and args.on_cycle:
+        # A repeated board in a random run is a coincidence, not a cycle.
+        parser.error("--on-cycle needs a deterministic run (no --underpop, --overpop or --birth)")
+    if args.checkpoint and not bounded:
+        parser.error("--checkpoint needs a bounded engine (dense, bitpacked, tiled or parallel)")
+    if args.generations < 1:
+        parser.error("--generations must be at least 1")
+    if args.sample_every is not None and args.sample_every < 1:
+        parser.error("--sample-every must be at least 1")
+
+    path = resolve_pattern_path(args.pattern)
+    if not os.path.isfile(path):
+        parser.error(f"pattern file not found: {args.pattern}")
+    start, file_rule, start_generation, shape = read_start(path)
+    if shape is not None:
+        # A snapshot is used as stored (the bitpacked engine steps its memmap directly).
+        if tuple(args.offset) != (0, 0):
+            parser.error("--offset does not apply to a .snap snapshot")
+        args.height, args.width = shape
+    else:
+        start = (start[0] + args.offset[0], start[1] + args.offset[1])
+    rule = parse_rule(args.rule or file_rule or LIFE)
+    board = make_board(args.engine, start, rule, (args.height, args.width), args.workers)
+    if stochastic:
+        board.stepper = StochasticStepper(rule, args.underpop, args.overpop, args.birth, args.seed)
+    sample_every = args.sample_every or max(1, args.generations // 1000)
+    if args.engine == "hashlife" and not args.sample_every:
+        # Sample at power-of-two boundaries so every chunk is a single HashLife jump.
+        sample_every = 1 << (sample_every.bit_length() - 1)
+
+    try:
+        populations, elapsed, done, cycle = run(board, args.generations, sample_every, args.on_cycle)
+        final_xs, final_ys = board.cells()
+        if args.checkpoint:
+            packed = board.packed if isinstance(board, PackedBoard) else pack_grid(board.grid)
+            if isinstance(packed, np.memmap):
+                # Still the starting snapshot: copy it, the checkpoint may overwrite that file.
+                packed = np.array(packed)
+            save_packed_snapshot(args.checkpoint, packed, args.width, rule, start_generation + done)
+    finally:
+        if hasattr(board, "close"):
+            board.close()
+
+    output = args.output or os.path.splitext(os.path.basename(path))[0] + "-final.txt"
+    write_pattern(output, final_xs, final_ys, rule)
+
+    board_text = f"a {args.width}x{args.height} torus" if bounded else "the unbounded plane"
+    rate = done / elapsed if elapsed > 0 else float("inf")
+    print(f"Pattern:      {path} ({populations[0]} cells, rule {rule})")
+    print(f"Engine:       {args.engine} on {board_text}")
+    print(f"Generations:  {done} in {elapsed:.3f} s ({rate:.1f} gen/s)"
+          + (f", resumed at generation {start_generation}" if start_generation else ""))
+    print(f"Population:   initial {populations[0]}, final {populations[-1]}, "
+          f"min {populations.min()}, max {populations.max()}, mean {populations.mean():.1f} "
+          f"(sampled every {sample_every} generations)")
+    if cycle is not None:
+        first, period = cycle
+        kind = "still life" if period == 1 else f"oscillator, period {period}"
+        print(f"Cycle:        {kind} from generation {first + start_generation}"
+              + (" (skipped to the end)" if args.on_cycle == "skip" else " (stopped)"))
+    print(f"Final pattern saved to {output}")
+    if args.checkpoint:
+        print(f"Snapshot saved to {args.checkpoint} (generation {start_generation + done})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,12 @@ import os
 import pygame
 import numpy as np
 
+from life.engine import step
+from life.patterns import iter_pattern, write_pattern
+from life.render import GridRenderer
+from life.rules import parse_rule
+from life.tiles import TiledStepper
+
 # Initialize Pygame
 pygame.init()
 
@@ -12,6 +18,8 @@ GRID_WIDTH = WIDTH // CELL_SIZE
 GRID_HEIGHT = HEIGHT // CELL_SIZE
 FPS = 10
 CHARGEFILE = "pattern-slider1.txt"
+RULE = parse_rule("B2/S23")
+USE_TILED_ENGINE = False  # Only recompute the 64x64 tiles that changed (large, mostly settled boards)
 
 # Colors
 BLACK = (0, 0, 0)
@@ -20,6 +28,7 @@ WHITE = (255, 255, 255)
 # Initialize screen
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Conway's Game of Life")
+renderer = GridRenderer(WHITE, BLACK)
 
 # Utility: get the absolute path for the pattern file in the same directory as the script.
 def get_pattern_file_path(filename="pattern.txt"):
@@ -32,47 +41,17 @@ def create_grid():
 
 def draw_grid(grid, offset_x, offset_y, cell_size):
     screen.fill(BLACK)
-    for y in range(grid.shape[0]):
-        for x in range(grid.shape[1]):
-            if grid[y, x] == 1:
-                pygame.draw.rect(
-                    screen, WHITE,
-                    ((x * cell_size) + offset_x, (y * cell_size) + offset_y, cell_size, cell_size)
-                )
+    renderer.draw(screen, grid, offset_x, offset_y, cell_size)
 
 def update_grid(grid):
-    new_grid = np.copy(grid)
-    for y in range(grid.shape[0]):
-        for x in range(grid.shape[1]):
-            # Count live neighbors
-            neighbors = (
-                grid[(y - 1) % grid.shape[0], (x - 1) % grid.shape[1]]
-                + grid[(y - 1) % grid.shape[0], x % grid.shape[1]]
-                + grid[(y - 1) % grid.shape[0], (x + 1) % grid.shape[1]]
-                + grid[y % grid.shape[0], (x - 1) % grid.shape[1]]
-                + grid[y % grid.shape[0], (x + 1) % grid.shape[1]]
-                + grid[(y + 1) % grid.shape[0], (x - 1) % grid.shape[1]]
-                + grid[(y + 1) % grid.shape[0], x % grid.shape[1]]
-                + grid[(y + 1) % grid.shape[0], (x + 1) % grid.shape[1]]
-            )
-
-            # Apply rules
-            if grid[y, x] == 1:
-                if neighbors < 2 or neighbors > 3:
-                    new_grid[y, x] = 0
-            elif grid[y, x] == 0 and neighbors == 2:
-                new_grid[y, x] = 1
-
-    return new_grid
+    return step(grid, RULE)
 
 def save_pattern(grid, filename="pattern.txt"):
     """Export live cell coordinates to a text file in the same directory as the script."""
     path = get_pattern_file_path(filename)
-    with open(path, "w") as f:
-        for y in range(grid.shape[0]):
-            for x in range(grid.shape[1]):
-                if grid[y, x] == 1:
-                    f.write(f"{x} {y}\n")
+    ys, xs = np.nonzero(grid == 1)
+    # The extension picks the format: .rle (with the rule), .lif, .cells, or "x y" lines.
+    write_pattern(path, xs, ys, RULE)
     print(f"Pattern saved to {path}")
 
 def load_pattern(grid, filename=CHARGEFILE, offset=(0,0)):
@@ -80,13 +59,11 @@ def load_pattern(grid, filename=CHARGEFILE, offset=(0,0)):
     path = get_pattern_file_path(filename)
     offset_x, offset_y = offset
     try:
-        with open(path, "r") as f:
-            for line in f:
-                x, y = map(int, line.strip().split())
-                new_x = x + offset_x
-                new_y = y + offset_y
-                if 0 <= new_x < grid.shape[1] and 0 <= new_y < grid.shape[0]:
-                    grid[new_y, new_x] = 1
+        # Any format of life/patterns.py; large RLE files are decoded chunk by chunk.
+        for xs, ys in iter_pattern(path):
+            xs, ys = xs + offset_x, ys + offset_y
+            inside = (xs >= 0) & (xs < grid.shape[1]) & (ys >= 0) & (ys < grid.shape[0])
+            grid[ys[inside], xs[inside]] = 1
         print(f"Pattern loaded from {path}")
     except Exception as e:
         print(f"Error loading pattern from {path}: {e}")
@@ -94,6 +71,7 @@ def load_pattern(grid, filename=CHARGEFILE, offset=(0,0)):
 
 def main():
     clock = pygame.time.Clock()
+    advance = TiledStepper(RULE) if USE_TILED_ENGINE else update_grid
     grid = create_grid()
     initial_grid = np.copy(grid)  # Store the initial state
     running = True
@@ -142,7 +120,7 @@ def main():
                     cell_size = max(5, cell_size - 1)
 
         if not paused:
-            grid = update_grid(grid)
+            grid = advance(grid)
 
         draw_grid(grid, offset_x, offset_y, cell_size)
         pygame.display.flip()
@@ -155,7 +133,12 @@ if __name__ == "__main__":
 import os
 import pygame
 import numpy as np
-import random
+
+from life.patterns import iter_pattern, write_pattern
+from life.render import GridRenderer
+from life.rules import parse_rule
+from life.stochastic import StochasticStepper
+from life.tiles import TiledStepper
 
 # Initialize Pygame
 pygame.init()
@@ -166,11 +149,15 @@ CELL_SIZE = 10
 GRID_WIDTH = WIDTH // CELL_SIZE
 GRID_HEIGHT = HEIGHT // CELL_SIZE
 FPS = 10
+# B3/S23 plus birth on exactly two neighbors when they sit on opposite corners (Hensel's 2n).
+RULE = parse_rule("B2n3/S23")
+USE_TILED_ENGINE = False  # Only recompute the 64x64 tiles that changed (ignored while survival is random)
 
 # Survivor modification probabilities:
 # A live cell facing under- or overpopulation may survive with these probabilities.
 UNDERPOP_SURVIVE_PROB = 0.2  # 20% chance to survive if neighbors < 2
 OVERPOP_SURVIVE_PROB = 0.2   # 20% chance to survive if neighbors > 3
+SEED = None  # Set an integer to replay exactly the same random run
 
 # Colors
 BLACK = (0, 0, 0)
@@ -179,6 +166,7 @@ WHITE = (255, 255, 255)
 # Initialize screen
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Conway's Game of Life with Survivor Modification")
+renderer = GridRenderer(WHITE, BLACK)
 
 def get_pattern_file_path(filename="pattern.txt"):
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -190,69 +178,30 @@ def create_grid():
 
 def draw_grid(grid, offset_x, offset_y, cell_size):
     screen.fill(BLACK)
-    for y in range(grid.shape[0]):
-        for x in range(grid.shape[1]):
-            if grid[y, x] == 1:
-                pygame.draw.rect(
-                    screen, WHITE,
-                    ((x * cell_size) + offset_x, (y * cell_size) + offset_y, cell_size, cell_size)
-                )
+    renderer.draw(screen, grid, offset_x, offset_y, cell_size)
+
+# One random number per cell and generation, drawn from a seeded numpy Generator.
+stochastic_step = StochasticStepper(RULE, UNDERPOP_SURVIVE_PROB, OVERPOP_SURVIVE_PROB, seed=SEED)
 
 def update_grid(grid):
-    new_grid = np.copy(grid)
-    rows, cols = grid.shape
-    for y in range(rows):
-        for x in range(cols):
-            # Count live neighbors with wrapping at the edges
-            total = (
-                grid[(y - 1) % rows, (x - 1) % cols] +
-                grid[(y - 1) % rows, x % cols] +
-                grid[(y - 1) % rows, (x + 1) % cols] +
-                grid[y % rows, (x - 1) % cols] +
-                grid[y % rows, (x + 1) % cols] +
-                grid[(y + 1) % rows, (x - 1) % cols] +
-                grid[(y + 1) % rows, x % cols] +
-                grid[(y + 1) % rows, (x + 1) % cols]
-            )
-
-            if grid[y, x] == 1:
-                # Standard survival rules: live cell survives if it has 2 or 3 neighbors
-                if total < 2 or total > 3:
-                    new_grid[y, x] = 0
-            else:
-                # Modified birth conditions:
-                if total == 3:
-                    new_grid[y, x] = 1
-                elif total == 2:
-                    # Check for diagonal arrangement:
-                    n_tl = grid[(y - 1) % rows, (x - 1) % cols]
-                    n_tr = grid[(y - 1) % rows, (x + 1) % cols]
-                    n_bl = grid[(y + 1) % rows, (x - 1) % cols]
-                    n_br = grid[(y + 1) % rows, (x + 1) % cols]
-                    if (n_tl == 1 and n_br == 1) or (n_tr == 1 and n_bl == 1):
-                        new_grid[y, x] = 1
-    return new_grid
+    return stochastic_step(grid)
 
 def save_pattern(grid, filename="pattern.txt"):
     path = get_pattern_file_path(filename)
-    with open(path, "w") as f:
-        for y in range(grid.shape[0]):
-            for x in range(grid.shape[1]):
-                if grid[y, x] == 1:
-                    f.write(f"{x} {y}\n")
+    ys, xs = np.nonzero(grid == 1)
+    # The extension picks the format: .rle (with the rule), .lif, .cells, or "x y" lines.
+    write_pattern(path, xs, ys, RULE)
     print(f"Pattern saved to {path}")
 
 def load_pattern(grid, filename="pattern.txt", offset=(0, 0)):
     path = get_pattern_file_path(filename)
     offset_x, offset_y = offset
     try:
-        with open(path, "r") as f:
-            for line in f:
-                x, y = map(int, line.strip().split())
-                new_x = x + offset_x
-                new_y = y + offset_y
-                if 0 <= new_x < grid.shape[1] and 0 <= new_y < grid.shape[0]:
-                    grid[new_y, new_x] = 1
+        # Any format of life/patterns.py; large RLE files are decoded chunk by chunk.
+        for xs, ys in iter_pattern(path):
+            xs, ys = xs + offset_x, ys + offset_y
+            inside = (xs >= 0) & (xs < grid.shape[1]) & (ys >= 0) & (ys < grid.shape[0])
+            grid[ys[inside], xs[inside]] = 1
         print(f"Pattern loaded from {path}")
     except Exception as e:
         print(f"Error loading pattern from {path}: {e}")
@@ -260,6 +209,8 @@ def load_pattern(grid, filename="pattern.txt", offset=(0, 0)):
 
 def main():
     clock = pygame.time.Clock()
+    deterministic = UNDERPOP_SURVIVE_PROB == 0 and OVERPOP_SURVIVE_PROB == 0
+    advance = TiledStepper(RULE) if USE_TILED_ENGINE and deterministic else update_grid
     grid = create_grid()
     running = True
     paused = True
@@ -296,7 +247,7 @@ def main():
                     cell_size = max(5, cell_size - 1)
 
         if not paused:
-            grid = update_grid(grid)
+            grid = advance(grid)
 
         draw_grid(grid, offset_x, offset_y, cell_size)
         pygame.display.flip()